@@ -26,7 +26,8 @@ app.use(express.json());
 // Initialize services
 const cacheService = new CacheService();
 let healthService: HealthService;
-const droneService = new DroneService(cacheService);
+// DRONE_STREAM_PATCHES=true opts in to keyframes + merge-patches from the drone server
+const droneService = new DroneService(cacheService, undefined, undefined, process.env.DRONE_STREAM_PATCHES === 'true');
 
 let httpServer: any = null;
 let isShuttingDown = false;
@@ -143,6 +144,36 @@ app.get('/telemetry/history', (req, res) => {
     }
 });
 
+// Columnar history from the drone server, e.g. a decimated flight track:
+// /drone/history?start=...&fields=timestamp,latitude,longitude&max_points=500
+app.get('/drone/history', async (req, res) => {
+    try {
+        if (isShuttingDown) {
+            res.status(503).json({ error: 'Service shutting down' });
+            return;
+        }
+
+        const number = (name: string) => {
+            const value = req.query[name];
+            return value === undefined ? undefined : Number(value);
+        };
+        const fields = req.query.fields as string | undefined;
+        const decimation = req.query.decimation as string | undefined;
+        const data = await droneService.getHistory({
+            start: number('start'),
+            end: number('end'),
+            fields: fields ? fields.split(',') : undefined,
+            interval: number('interval'),
+            max_points: number('max_points'),
+            decimation
+        });
+        res.json({ data });
+    } catch (err: any) {
+        console.error('[Server] /drone/history endpoint error:', err);
+        res.status(502).json({ error: err?.message || 'History request failed' });
+    }
+});
+
 // Connection control endpoints
 app.post('/drone/connect', async (req, res) => {
     try {
@@ -1,24 +1,47 @@
 import { WebSocketClient } from '../wsClient';
 import { CacheService } from './CacheService';
 
+export interface HistoryQuery {
+    start?: number;
+    end?: number;
+    fields?: string[];
+    interval?: number;
+    max_points?: number;
+    decimation?: string;
+}
+
+interface PendingRequest {
+    resolve: (data: any) => void;
+    reject: (error: Error) => void;
+    timer: NodeJS.Timeout;
+}
+
 export class DroneService {
     private droneWS: WebSocketClient | null = null;
     private telemetryInterval?: NodeJS.Timeout | undefined;
     private readonly telemetryIntervalMs: number;
+    // get_history requests awaiting their reply, by request id
+    private pendingRequests = new Map<number, PendingRequest>();
+    private nextRequestId = 1;
+    private readonly requestTimeoutMs = 10000;
 
     constructor(
         private cacheService: CacheService,
         private wsUrl: string = 'ws://10.238.221.234:8765',
-        telemetryIntervalMs: number = 1000
+        telemetryIntervalMs: number = 1000,
+        private streamPatches: boolean = false
     ) {
         this.telemetryIntervalMs = telemetryIntervalMs;
     }
 
     async start(): Promise<void> {
         try {
-            this.droneWS = new WebSocketClient(this.wsUrl);
+            this.droneWS = new WebSocketClient(this.wsUrl, undefined, undefined, this.streamPatches);
 
             this.droneWS.on('message', (data) => {
+                if (this.settleRequest(data)) {
+                    return;
+                }
                 try {
                     this.cacheService.updateTelemetryCache(data);
                 } catch (err) {
@@ -63,9 +86,52 @@ export class DroneService {
         }, this.telemetryIntervalMs);
     }
 
+    // Columnar history from the Python server (its get_history action), e.g. the decimated flight track
+    getHistory(query: HistoryQuery): Promise<any> {
+        return new Promise((resolve, reject) => {
+            if (!this.droneWS || !this.droneWS.isConnected()) {
+                reject(new Error('WebSocket connection not available'));
+                return;
+            }
+            const id = this.nextRequestId++;
+            const timer = setTimeout(() => {
+                this.pendingRequests.delete(id);
+                reject(new Error('History request timed out'));
+            }, this.requestTimeoutMs);
+            this.pendingRequests.set(id, { resolve, reject, timer });
+            if (!this.droneWS.sendMessage({ action: 'get_history', id, ...query })) {
+                clearTimeout(timer);
+                this.pendingRequests.delete(id);
+                reject(new Error('Failed to send history request'));
+            }
+        });
+    }
+
+    // Resolves the pending request a reply belongs to; false for telemetry and other messages
+    private settleRequest(message: any): boolean {
+        const pending = typeof message?.id === 'number' ? this.pendingRequests.get(message.id) : undefined;
+        if (!pending) {
+            return false;
+        }
+        clearTimeout(pending.timer);
+        this.pendingRequests.delete(message.id);
+        if (message.error) {
+            pending.reject(new Error(message.error));
+        } else {
+            pending.resolve(message.data);
+        }
+        return true;
+    }
+
     async stop(): Promise<void> {
         console.log('[DroneService] Stopping drone service...');
 
+        for (const pending of this.pendingRequests.values()) {
+            clearTimeout(pending.timer);
+            pending.reject(new Error('Drone service stopped'));
+        }
+        this.pendingRequests.clear();
+
         // Stop telemetry polling
         if (this.telemetryInterval) {
             clearInterval(this.telemetryInterval);
@@ -0,0 +1,62 @@
+// telemetryStream.ts
+
+// Applies a JSON merge-patch (RFC 7386): null removes a key, objects merge
+// recursively, anything else (including arrays) replaces the value. Returns a
+// new object; untouched branches are shared with target, which is not modified.
+export function applyMergePatch(target: any, patch: any): any {
+    const result: any = typeof target === 'object' && target !== null && !Array.isArray(target)
+        ? { ...target }
+        : {};
+    for (const [key, value] of Object.entries(patch)) {
+        if (value === null) {
+            delete result[key];
+        } else if (typeof value === 'object' && !Array.isArray(value)) {
+            result[key] = applyMergePatch(result[key], value);
+        } else {
+            result[key] = value;
+        }
+    }
+    return result;
+}
+
+export type StreamResult =
+    | { kind: 'snapshot'; data: any }
+    | { kind: 'resync' }
+    | { kind: 'other' };
+
+// Rebuilds full telemetry snapshots from the server's "patch" stream mode:
+// a keyframe replaces the state, a patch applies only on top of its base seq.
+export class TelemetryStreamDecoder {
+    private state: any = null;
+    private seq: number | null = null;
+
+    handle(message: any): StreamResult {
+        if (message?.type === 'keyframe') {
+            this.state = message.data;
+            this.seq = message.seq;
+            return { kind: 'snapshot', data: this.state };
+        }
+
+        if (message?.type === 'patch') {
+            if (this.state === null) {
+                // Waiting for the keyframe already requested
+                return { kind: 'other' };
+            }
+            if (message.base !== this.seq) {
+                // Missed a frame - the patch has nothing to apply to
+                this.reset();
+                return { kind: 'resync' };
+            }
+            this.state = applyMergePatch(this.state, message.patch);
+            this.seq = message.seq;
+            return { kind: 'snapshot', data: this.state };
+        }
+
+        return { kind: 'other' };
+    }
+
+    reset(): void {
+        this.state = null;
+        this.seq = null;
+    }
+}
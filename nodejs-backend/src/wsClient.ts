@@ -1,6 +1,7 @@
 // wsClient.ts
 import WebSocket from 'ws';
 import EventEmitter from 'events';
+import { TelemetryStreamDecoder } from './telemetryStream';
 
 export class WebSocketClient extends EventEmitter {
     url: string;
@@ -10,10 +11,14 @@ export class WebSocketClient extends EventEmitter {
     private reconnectAttempts: number;
     private isClosing: boolean;
     private reconnectTimeout?: NodeJS.Timeout | undefined;
+    // When set, telemetry arrives as keyframes + merge-patches and is emitted as full snapshots
+    private streamPatches: boolean;
+    private streamDecoder = new TelemetryStreamDecoder();
 
-    constructor(url: string, reconnectInterval = 2000, maxReconnectAttempts = 10) {
+    constructor(url: string, reconnectInterval = 2000, maxReconnectAttempts = 10, streamPatches = false) {
         super();
         this.url = url;
+        this.streamPatches = streamPatches;
         this.reconnectInterval = reconnectInterval;
         this.maxReconnectAttempts = maxReconnectAttempts;
         this.reconnectAttempts = 0;
@@ -32,13 +37,28 @@ export class WebSocketClient extends EventEmitter {
             this.ws.on('open', () => {
                 console.log(`[WS] Connected to ${this.url}`);
                 this.reconnectAttempts = 0;
+                if (this.streamPatches) {
+                    this.requestKeyframe();
+                }
                 this.emit('open');
             });
 
             this.ws.on('message', (data) => {
                 try {
                     const json = JSON.parse(data.toString());
-                    this.emit('message', json);
+                    if (!this.streamPatches) {
+                        this.emit('message', json);
+                        return;
+                    }
+                    const result = this.streamDecoder.handle(json);
+                    if (result.kind === 'snapshot') {
+                        this.emit('message', result.data);
+                    } else if (result.kind === 'resync') {
+                        console.warn('[WS] Telemetry stream gap, requesting keyframe');
+                        this.requestKeyframe();
+                    } else if (json?.type !== 'stream') {
+                        this.emit('message', json);
+                    }
                 } catch (err) {
                     console.error('[WS] JSON parse error:', err, 'Data:', data.toString());
                     this.emit('error', err);
@@ -70,6 +90,12 @@ export class WebSocketClient extends EventEmitter {
         }
     }
 
+    // Opting in (again) to the patch stream makes the server send a keyframe next
+    private requestKeyframe() {
+        this.streamDecoder.reset();
+        this.sendMessage({ action: 'stream', mode: 'patch' });
+    }
+
     private scheduleReconnect() {
         if (this.isClosing) {
             return;
@@ -0,0 +1,179 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from websockets.exceptions import ConnectionClosed
+
+
+# Highest per-group rate a client may subscribe at, in Hz
+MAX_SUBSCRIPTION_RATE = 50
+
+
+class ClientQueueOverflow(Exception):
+    pass
+
+
+class ClientChannel:
+    """Bounded outbound queue and writer task for one WebSocket client.
+
+    Control messages (responses, health) are queued in order and always sent,
+    ahead of telemetry. Telemetry is conflated: each topic keeps only its newest
+    message, so a slow consumer skips stale frames instead of buffering them.
+    A client whose control backlog exceeds ``max_control`` is too far behind to
+    serve and is disconnected, which keeps memory bounded.
+    """
+
+    def __init__(self, websocket, max_control=256):
+        self.websocket = websocket
+        self.max_control = max_control
+        self.control = deque()
+        self.latest = {}  # topic -> newest unsent message
+        self._wakeup = asyncio.Event()
+        self.task = None
+        self.closed = False
+
+        # {group: max rate in Hz} chosen with the subscribe action; None means
+        # the client receives the full snapshot broadcast
+        self.subscriptions = None
+        self.next_due = {}
+        self.sent_seqs = {}
+
+        # "full" snapshots or "patch" (keyframes plus merge-patches, see DeltaStream)
+        self.stream_mode = "full"
+        self.needs_keyframe = True
+        self.last_keyframe = 0.0
+        # Encoding of full-snapshot telemetry: "json", "struct" or "msgpack"
+        self.wire_format = "json"
+
+        # Accounting
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.last_send_duration = None
+
+    @property
+    def depth(self):
+        return len(self.control) + len(self.latest)
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+        return self.task
+
+    async def stop(self):
+        self.closed = True
+        if self.task is not None and self.task is not asyncio.current_task():
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.task = None
+
+    def subscribe(self, groups):
+        """Replace the client's subscriptions with {group: rate}; None restores full snapshots"""
+        if groups is None:
+            self.subscriptions = None
+        else:
+            self.subscriptions = {
+                group: min(float(rate), MAX_SUBSCRIPTION_RATE) for group, rate in groups.items()
+            }
+        self.next_due = {}
+        self.sent_seqs = {}
+        self.needs_keyframe = True
+        # Pending frames may hold groups the client no longer wants
+        self.latest.clear()
+
+    def set_stream_mode(self, mode):
+        """Switch between "full" and "patch" broadcasts; the next frame is a keyframe"""
+        self.stream_mode = mode
+        self.needs_keyframe = True
+        if mode == "patch":
+            # Patches are JSON only
+            self.wire_format = "json"
+        self.latest.pop("telemetry", None)
+
+    def set_wire_format(self, fmt):
+        """Switch the encoding of full-snapshot telemetry"""
+        self.wire_format = fmt
+        if fmt != "json":
+            self.stream_mode = "full"
+        self.latest.pop("telemetry", None)
+
+    def due_groups(self, now, group_seqs):
+        """Subscribed groups whose rate allows a send now and that changed since the last one"""
+        due = []
+        for group, rate in self.subscriptions.items():
+            if self.next_due.get(group, 0) > now:
+                continue
+            seq = group_seqs[group]
+            if self.sent_seqs.get(group) == seq:
+                continue
+            self.next_due[group] = now + 1.0 / rate
+            self.sent_seqs[group] = seq
+            due.append(group)
+        return due
+
+    def put_control(self, message):
+        """Queue a message that must be delivered"""
+        if self.closed:
+            return
+        if len(self.control) >= self.max_control:
+            raise ClientQueueOverflow(f"{self.max_control} control messages pending")
+        self.control.append(message)
+        self._queued()
+
+    def put_latest(self, message, topic="telemetry"):
+        """Queue a telemetry message, replacing any unsent one on the same topic"""
+        if self.closed:
+            return
+        if topic in self.latest:
+            self.dropped += 1
+        self.latest[topic] = message
+        self._queued()
+
+    def _queued(self):
+        self.max_depth = max(self.max_depth, self.depth)
+        self._wakeup.set()
+
+    def _next(self):
+        if self.control:
+            return self.control.popleft()
+        topic = next(iter(self.latest))
+        return self.latest.pop(topic)
+
+    async def _run(self):
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self.control or self.latest:
+                    message = self._next()
+                    started = time.perf_counter()
+                    await self.websocket.send(message)
+                    self.last_send_duration = time.perf_counter() - started
+                    self.sent += 1
+        except ConnectionClosed:
+            pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Client writer error for {self.websocket.remote_address}: {e}")
+        finally:
+            self.closed = True
+
+    def get_stats(self):
+        """Get per-client queue statistics for monitoring"""
+        return {
+            "remote_address": str(self.websocket.remote_address),
+            "connected_seconds": time.time() - self.connected_at,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "control_pending": len(self.control),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "subscriptions": self.subscriptions,
+            "stream_mode": self.stream_mode,
+            "wire_format": self.wire_format,
+            "last_send_duration": self.last_send_duration
+        }
@@ -0,0 +1,95 @@
+import heapq
+import numpy as np
+
+
+def lttb(x, y, max_points):
+    """Largest-Triangle-Three-Buckets downsampling of the series (x, y).
+
+    Returns the indices of at most ``max_points`` samples to keep, always
+    including the first and last one. The area computation for each bucket is
+    vectorized; only the walk over buckets is a Python loop.
+    """
+    n = len(x)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1])
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket edges over the samples between the two fixed endpoints
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+
+    for bucket in range(max_points - 2):
+        lo, hi = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+        # Average of the next bucket (or the last point) is the third vertex
+        next_lo, next_hi = hi, (edges[bucket + 2] if bucket + 2 < len(edges) else n)
+        if next_lo >= next_hi:
+            cx, cy = x[n - 1], y[n - 1]
+        else:
+            cx, cy = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        keep[bucket + 1] = a
+
+    return keep
+
+
+def _segment_distances(x, y, lo, hi):
+    """Perpendicular distance of the points strictly between lo and hi to segment lo-hi"""
+    dx, dy = x[hi] - x[lo], y[hi] - y[lo]
+    px, py = x[lo + 1:hi] - x[lo], y[lo + 1:hi] - y[lo]
+    length = np.hypot(dx, dy)
+    if length == 0:
+        return np.hypot(px, py)
+    return np.abs(dx * py - dy * px) / length
+
+
+def douglas_peucker(x, y, epsilon=None, max_points=None):
+    """Douglas-Peucker simplification of the polyline (x, y).
+
+    Segments are split on their farthest point, largest error first, until every
+    remaining error is below ``epsilon`` or ``max_points`` indices are kept.
+    Returns the sorted indices of the kept points.
+    """
+    n = len(x)
+    if n <= 2 or (epsilon is None and (max_points is None or max_points >= n)):
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    limit = n if max_points is None else max(2, max_points)
+    threshold = 0.0 if epsilon is None else epsilon
+
+    kept = [0, n - 1]
+    heap = []
+
+    def push(lo, hi):
+        if hi - lo < 2:
+            return
+        distances = _segment_distances(x, y, lo, hi)
+        i = int(np.argmax(distances))
+        if distances[i] > threshold:
+            heapq.heappush(heap, (-distances[i], lo, hi, lo + 1 + i))
+
+    push(0, n - 1)
+    while heap and len(kept) < limit:
+        _, lo, hi, split = heapq.heappop(heap)
+        kept.append(split)
+        push(lo, split)
+        push(split, hi)
+
+    return np.array(sorted(kept), dtype=np.int64)
+
+
+def track_coordinates(latitude, longitude):
+    """Project lat/lon to a locally equal-area plane (degrees of latitude)"""
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    scale = np.cos(np.radians(np.nanmean(latitude))) if len(latitude) else 1.0
+    return longitude * scale, latitude
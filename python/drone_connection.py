@@ -6,13 +6,26 @@ import random
 from datetime import datetime, timedelta
 from dronekit import connect
 from telemetary_data import TelemetryData
-from circuit_breaker import CircuitBreaker, circuit_breaker_registry
+from telemetry_frame import DISCONNECTED_FRAME
+from telemetry_store import TelemetryStore
+from telemetry_scheduler import TelemetryScheduler
+from mavlink_engine import MavlinkEngine
+from ring_buffer import TelemetryRingBuffer
+from telemetry_history import TelemetryHistory
+from rolling_stats import RollingAggregates
+from flight_recorder import FlightRecorder
+from history_segments import SegmentStore
+from circuit_breaker import CircuitBreaker, CircuitBreakerState, circuit_breaker_registry
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 
 class DroneConnection:
-    def __init__(self, reconnect_interval=5, max_retry_attempts=5, max_cache_size=100, cache_ttl=300):
+    def __init__(self, reconnect_interval=5, max_retry_attempts=5, max_cache_size=100, cache_ttl=300,
+                 acquisition_mode="poll", snapshot_deadline=None, refresh_rates=None,
+                 mavlink_endpoint=None, publish_interval=None, history_max_samples=1_000_000,
+                 recording_path=None, max_cache_bytes=None, history_dir=None, history_chunk_seconds=60,
+                 history_codec="zlib"):
         self.vehicle = None
         self.is_connected = False
         self.is_arm = False
@@ -23,11 +36,53 @@ class DroneConnection:
         self.thread = None
         self.telemetry = None
 
+        # "poll" reads every group from the vehicle per snapshot,
+        # "push" serves snapshots from a listener-fed TelemetryStore,
+        # "tiered" serves them from a TelemetryScheduler refreshing each group
+        # at its own rate (refresh_rates overrides the per-group Hz),
+        # "mavlink" decodes every group straight from a second MAVLink
+        # stream at mavlink_endpoint (e.g. "udpin:0.0.0.0:14551")
+        self.acquisition_mode = acquisition_mode
+        self.refresh_rates = refresh_rates
+        self.mavlink_endpoint = mavlink_endpoint
+        self.telemetry_source = None
+        # Overall deadline (seconds) for a concurrent poll snapshot; None keeps
+        # the sequential per-group timeouts
+        self.snapshot_deadline = snapshot_deadline
+
+        # Single-writer publication: the acquisition thread builds frames and
+        # publishes them by swapping this reference; readers never lock
+        self.telemetry_snapshot = None  # last published TelemetryFrame
+        # Polling reads every group from the vehicle, so by default it runs at the
+        # 1 s broadcast cadence; the other sources only assemble cached groups
+        if publish_interval is None:
+            publish_interval = 1.0 if acquisition_mode == "poll" else 0.1
+        self.publish_interval = publish_interval
+        self.acquiring = False
+        self.acquisition_thread = None
+        self.publish_count = 0
+        self.publish_failures = 0
+        self.last_acquire_duration = None
+
         # Enhanced telemetry caching with memory management
-        self.telemetry_snapshot = {}
-        self.telemetry_cache = {}  
+        # Entry sizes are measured once on insert; max_cache_bytes adds a byte
+        # budget on top of the entry count
+        self.telemetry_cache = TelemetryRingBuffer(max_cache_size, ttl=cache_ttl, max_bytes=max_cache_bytes)
         self.max_cache_size = max_cache_size
+        self.max_cache_bytes = max_cache_bytes
         self.cache_ttl = cache_ttl  
+        # Columnar scalar history of every published frame, kept across reconnects
+        self.history = TelemetryHistory(max_samples=history_max_samples)
+        # Rolling 10 s / 1 min / 10 min aggregates, updated once per published frame
+        self.rolling = RollingAggregates()
+        # Optional append-only flight log of every published frame; written by
+        # its own thread so the acquisition loop only enqueues
+        self.recorder = FlightRecorder(recording_path) if recording_path else None
+        # Optional long-retention history on disk as compressed per-column chunks
+        self.segments = (
+            SegmentStore(history_dir, chunk_seconds=history_chunk_seconds, codec=history_codec)
+            if history_dir else None
+        )
         self.lock = threading.Lock()
         self.reconnect_interval = reconnect_interval 
         self.connection_string = None
@@ -56,110 +111,75 @@ class DroneConnection:
         # Register circuit breakers
         circuit_breaker_registry.register_breaker(self.connection_breaker)
         circuit_breaker_registry.register_breaker(self.telemetry_breaker)
-        
-        # Start cache cleanup thread
-        self.cache_cleanup_thread = threading.Thread(target=self._cache_cleanup_worker, daemon=True)
-        self.cache_cleanup_thread.start()
-
-    def _cache_cleanup_worker(self):
-        """Background worker to clean up expired cache entries"""
-        while True:
-            try:
-                with self.lock:
-                    current_time = time.time()
-                    expired_keys = []
-                    
-                    # Find expired entries
-                    for key, (timestamp, data) in self.telemetry_cache.items():
-                        if current_time - timestamp > self.cache_ttl:
-                            expired_keys.append(key)
-                    
-                    # Remove expired entries
-                    for key in expired_keys:
-                        del self.telemetry_cache[key]
-                    
-                    # Enforce cache size limit (remove oldest entries)
-                    if len(self.telemetry_cache) > self.max_cache_size:
-                        # Sort by timestamp and remove oldest
-                        sorted_items = sorted(
-                            self.telemetry_cache.items(),
-                            key=lambda x: x[1][0]  # Sort by timestamp
-                        )
-                        excess_count = len(self.telemetry_cache) - self.max_cache_size
-                        for i in range(excess_count):
-                            key_to_remove = sorted_items[i][0]
-                            del self.telemetry_cache[key_to_remove]
-                    
-                    if expired_keys or len(self.telemetry_cache) > self.max_cache_size:
-                        logging.debug(f"Cache cleanup: removed {len(expired_keys)} expired entries, "
-                                    f"cache size now: {len(self.telemetry_cache)}")
-                
-                time.sleep(30)  # Cleanup every 30 seconds
-                
-            except Exception as e:
-                logging.error(f"Cache cleanup error: {e}")
-                time.sleep(60)  # Back off on error
 
     def _store_in_cache(self, data):
         """Store telemetry data in cache with timestamp"""
         try:
             with self.lock:
-                timestamp = time.time()
-                cache_key = f"telemetry_{timestamp}"
-                self.telemetry_cache[cache_key] = (timestamp, data.copy())
-                
-                # Immediate size check (in case cleanup thread is behind)
-                if len(self.telemetry_cache) > self.max_cache_size * 1.2:  # 20% buffer
-                    # Emergency cleanup - remove oldest 25% of entries
-                    sorted_items = sorted(
-                        self.telemetry_cache.items(),
-                        key=lambda x: x[1][0]
-                    )
-                    remove_count = int(len(self.telemetry_cache) * 0.25)
-                    for i in range(remove_count):
-                        key_to_remove = sorted_items[i][0]
-                        del self.telemetry_cache[key_to_remove]
-                    
-                    logging.warning(f"Emergency cache cleanup: removed {remove_count} entries")
-                
+                # Frames are immutable, so the cache can hold them without copying.
+                # The ring overwrites its oldest entry when full and drops expired
+                # entries from the old end, so no cleanup pass is needed.
+                self.telemetry_cache.append(data.timestamp, data)
         except Exception as e:
             logging.error(f"Error storing in cache: {e}")
 
-    def get_cache_stats(self):
-        """Get cache statistics for monitoring"""
+    def get_cached_telemetry(self, timestamp):
+        """Latest cached TelemetryFrame at or before ``timestamp`` (O(log n)), or None"""
         with self.lock:
-            current_time = time.time()
-            total_entries = len(self.telemetry_cache)
-            
-            if total_entries == 0:
-                return {
-                    "total_entries": 0,
-                    "oldest_entry_age": 0,
-                    "newest_entry_age": 0,
-                    "cache_size_mb": 0,
-                    "max_cache_size": self.max_cache_size,
-                    "cache_ttl": self.cache_ttl
-                }
-            
-            # Calculate age statistics
-            timestamps = [item[0] for item in self.telemetry_cache.values()]
-            oldest_timestamp = min(timestamps)
-            newest_timestamp = max(timestamps)
-            
-            # Estimate memory usage (rough calculation)
-            import sys
-            total_size = sys.getsizeof(self.telemetry_cache)
-            for key, (timestamp, data) in self.telemetry_cache.items():
-                total_size += sys.getsizeof(key) + sys.getsizeof(timestamp) + sys.getsizeof(data)
-            
-            return {
-                "total_entries": total_entries,
-                "oldest_entry_age": current_time - oldest_timestamp,
-                "newest_entry_age": current_time - newest_timestamp,
-                "cache_size_mb": total_size / (1024 * 1024),
-                "max_cache_size": self.max_cache_size,
-                "cache_ttl": self.cache_ttl
-            }
+            entry = self.telemetry_cache.at_or_before(timestamp)
+        return entry[1] if entry else None
+
+    def get_history(self, start=None, end=None, fields=None, interval=None, max_points=None, decimation=None,
+                    bbox=None, near=None, archive=False):
+        """Columnar telemetry history between two timestamps, optionally area-filtered, resampled and decimated.
+
+        With ``archive`` the on-disk segments are queried instead of the in-memory history.
+        """
+        if archive:
+            if not self.segments:
+                raise ValueError("No on-disk history configured")
+            if bbox is not None or near is not None:
+                raise ValueError("Area filters are not supported on archived history")
+            return self.segments.query_json(start, end, fields, interval, max_points, decimation)
+        return self.history.query_json(start, end, fields, interval, max_points, decimation, bbox, near)
+
+    def telemetry_at(self, timestamp):
+        """Interpolated vehicle state at any instant covered by the history, or None.
+
+        Mode and system status come from the cached frame at or before
+        ``timestamp`` when it is still in the cache.
+        """
+        state = self.history.telemetry_at(timestamp)
+        if state is None:
+            return None
+        frame = self.get_cached_telemetry(timestamp)
+        if frame is not None:
+            state["mode"] = frame.state.mode
+            state["system_status"] = frame.state.system_status
+        return state
+
+    def get_cache_stats(self):
+        """Get cache statistics for monitoring (O(1), does not take the cache lock)"""
+        current_time = time.time()
+        cache = self.telemetry_cache
+        oldest_timestamp = cache.oldest_timestamp()
+        newest_timestamp = cache.newest_timestamp()
+        total_bytes = cache.total_bytes
+
+        return {
+            "total_entries": len(cache),
+            "oldest_entry_age": current_time - oldest_timestamp if oldest_timestamp is not None else 0,
+            "newest_entry_age": current_time - newest_timestamp if newest_timestamp is not None else 0,
+            "cache_size_bytes": total_bytes,
+            "cache_size_mb": total_bytes / (1024 * 1024),
+            "max_cache_size": self.max_cache_size,
+            "max_cache_bytes": self.max_cache_bytes,
+            "cache_ttl": self.cache_ttl,
+            "evicted_entries": cache.evicted,
+            "expired_entries": cache.expired,
+            "budget_evicted_entries": cache.budget_evicted,
+            "telemetry_memo": self.telemetry.get_memo_stats() if self.telemetry else None
+        }
 
     def _calculate_backoff_delay(self):
         """Calculate exponential backoff delay with jitter"""
@@ -213,12 +233,15 @@ class DroneConnection:
                 
                 self.vehicle = vehicle
                 self.is_connected = True
-                self.telemetry = TelemetryData(self.vehicle)
+                self.telemetry = TelemetryData(self.vehicle, snapshot_deadline=self.snapshot_deadline)
+                self.telemetry.watch_invalidations()
+                self._start_telemetry_source()
                 self._reset_retry_state()
                 logging.info(f"✅ Successfully connected to vehicle at {connection_string}")
                 logging.info(f"🔌 Connection status: is_connected={self.is_connected}, vehicle={self.vehicle is not None}")
                 logging.info(f"")
                 self.start_monitoring()
+                self.start_acquisition()
                 return True
                 
             except Exception as e:
@@ -245,6 +268,10 @@ class DroneConnection:
         try:
             if self.vehicle:
                 self.stop_monitoring()
+                self.stop_acquisition()
+                self._stop_telemetry_source()
+                if self.telemetry:
+                    self.telemetry.unwatch_invalidations()
                 self.vehicle.close()
                 self.vehicle = None
                 self.is_connected = False
@@ -271,71 +298,126 @@ class DroneConnection:
         self.thread = None
         logging.info("Stopped vehicle monitoring thread")
 
+    def start_acquisition(self):
+        if self.acquisition_thread is None or not self.acquisition_thread.is_alive():
+            self.acquiring = True
+            if self.recorder:
+                try:
+                    self.recorder.start()
+                except Exception as e:
+                    logging.error(f"Failed to start flight recorder: {e}")
+            self.acquisition_thread = threading.Thread(target=self._acquisition_worker, daemon=True)
+            self.acquisition_thread.start()
+            logging.info(f"Started telemetry acquisition thread ({self.acquisition_mode}, every {self.publish_interval}s)")
+
+    def stop_acquisition(self):
+        self.acquiring = False
+        if self.acquisition_thread is not None and threading.current_thread() != self.acquisition_thread:
+            self.acquisition_thread.join(timeout=5)
+        self.acquisition_thread = None
+        if self.recorder and self.recorder.running:
+            self.recorder.stop()
+        if self.segments:
+            self.segments.flush()
+        logging.info("Stopped telemetry acquisition thread")
+
+    def _acquisition_worker(self):
+        """Sole writer of telemetry_snapshot: build a frame, then publish it by reference swap"""
+        while self.acquiring:
+            started = time.monotonic()
+            try:
+                frame = self.telemetry_breaker.call(self._get_telemetry_snapshot)
+                if frame:
+                    # Keep the source's acquisition time so stale data fails freshness checks
+                    previous = self.telemetry_snapshot
+                    frame = frame.replace(connection_status="CONNECTED")
+                    # Single reference assignment - atomic for readers
+                    self.telemetry_snapshot = frame
+                    self.publish_count += 1
+                    if previous is None or frame.timestamp > previous.timestamp:
+                        # Only newly acquired data goes into the time series
+                        self._store_in_cache(frame)
+                        self.history.append(frame)
+                        self.rolling.update(frame)
+                        if self.segments:
+                            self.segments.append(frame)
+                        if self.recorder and self.recorder.running:
+                            self.recorder.record(frame)
+                else:
+                    self.publish_failures += 1
+            except Exception as e:
+                self.publish_failures += 1
+                logging.error(f"Telemetry acquisition error: {e}")
+
+            self.last_acquire_duration = time.monotonic() - started
+            time.sleep(max(0.0, self.publish_interval - self.last_acquire_duration))
+
+    def _start_telemetry_source(self):
+        """Create the snapshot source for the configured acquisition mode"""
+        if self.acquisition_mode == "push":
+            self.telemetry_source = TelemetryStore(self.vehicle)
+            self.telemetry_source.attach(self.telemetry)
+        elif self.acquisition_mode == "tiered":
+            self.telemetry_source = TelemetryScheduler(self.telemetry, rates=self.refresh_rates)
+            self.telemetry_source.start()
+        elif self.acquisition_mode == "mavlink":
+            if not self.mavlink_endpoint:
+                logging.error("MAVLink acquisition needs mavlink_endpoint - falling back to polling")
+                return
+            self.telemetry_source = MavlinkEngine(
+                self.mavlink_endpoint,
+                baud=self.baud or 57600,
+                seed=self.telemetry.snapshot_frame()
+            )
+            self.telemetry_source.start()
+
+    def _stop_telemetry_source(self):
+        if self.telemetry_source is None:
+            return
+        if isinstance(self.telemetry_source, TelemetryStore):
+            self.telemetry_source.detach()
+        else:
+            self.telemetry_source.stop()
+        self.telemetry_source = None
+
     def _get_telemetry_snapshot(self):
         """Internal method to get telemetry (protected by circuit breaker)"""
         if not self.telemetry or not self.is_connected:
             return None
-        return self.telemetry.full_snapshot()
+        if self.telemetry_source:
+            return self.telemetry_source.snapshot_frame()
+        return self.telemetry.snapshot_frame()
 
-    def get_snapshot(self):
-        """Thread-safe method to get current telemetry snapshot with fallback and circuit breaker"""
-        try:
-            # Increase timeout to 2 seconds to allow fresh data collection
-            if self.lock.acquire(timeout=2.0): 
-                try:
-                    logging.debug("🔒 Lock acquired - getting fresh telemetry snapshot")
-                    snapshot = self.telemetry_breaker.call(self._get_telemetry_snapshot)
-                    
-                    if snapshot:
-                        # Add current timestamp to ensure freshness
-                        snapshot["timestamp"] = time.time()
-                        snapshot["connection_status"] = "CONNECTED"
-                        
-                        self.telemetry_snapshot = snapshot
-                        # Store in historical cache
-                        self._store_in_cache(snapshot)
-                        
-                        # Log attitude values (yaw, pitch, roll)
-                        if 'attitude' in snapshot:
-                            attitude = snapshot['attitude']
-                            yaw = attitude.get('yaw', 0)
-                            pitch = attitude.get('pitch', 0) 
-                            roll = attitude.get('roll', 0)
-                            logging.info(f"📊 Attitude - Yaw: {yaw:.3f}°, Pitch: {pitch:.3f}°, Roll: {roll:.3f}°")
-                        else:
-                            logging.info(f"📊 Telemetry snapshot retrieved with {len(snapshot)} fields")
-                        
-                        return snapshot
-
-                    
-                    # Return cached data if current read fails
-                    if self.telemetry_snapshot:
-                        logging.warning("Using cached telemetry data due to read failure")
-                        return self.telemetry_snapshot
-                    
-                    # Return safe defaults if no data available
-                    return self._get_default_telemetry()
-                finally:
-                    self.lock.release()
-            else:
-                # Lock acquisition timeout - return cached data or defaults
-                if self.telemetry_snapshot:
-                    cached_data = self.telemetry_snapshot.copy()
-                    cached_data["connection_status"] = "LOCK_TIMEOUT"
-                    return cached_data
-                return self._get_default_telemetry()
-                
-        except Exception as e:
-            logging.error(f"Error getting telemetry snapshot: {e}")
-            
-            # Return cached data if available, otherwise defaults
-            if self.telemetry_snapshot:
-                logging.warning("Circuit breaker open or error - using cached telemetry")
-                cached_data = self.telemetry_snapshot.copy()
-                cached_data["connection_status"] = "CIRCUIT_BREAKER_OPEN"
-                return cached_data
-            
+    def get_snapshot(self, since=None):
+        """Thread-safe method to get current telemetry snapshot as a dict.
+
+        With ``since``, only groups that changed after that sequence are included.
+        """
+        return self.get_frame().to_dict(since=since)
+
+    def get_frame(self):
+        """Lock-free read of the latest published TelemetryFrame"""
+        frame = self.telemetry_snapshot
+        if frame is None:
             return self._get_default_telemetry()
+        if not self.is_connected:
+            return frame.replace(connection_status="DISCONNECTED")
+        if self.telemetry_breaker.state == CircuitBreakerState.OPEN:
+            return frame.replace(connection_status="CIRCUIT_BREAKER_OPEN")
+        return frame
+
+    def get_publication_stats(self):
+        """Get acquisition/publication statistics for monitoring"""
+        frame = self.telemetry_snapshot
+        return {
+            "acquisition_mode": self.acquisition_mode,
+            "acquiring": self.acquiring,
+            "publish_interval": self.publish_interval,
+            "publish_count": self.publish_count,
+            "publish_failures": self.publish_failures,
+            "last_acquire_duration": self.last_acquire_duration,
+            "last_publish_age": time.time() - frame.timestamp if frame else None
+        }
 
     def get_circuit_breaker_status(self):
         """Get status of all circuit breakers"""
@@ -346,19 +428,7 @@ class DroneConnection:
 
     def _get_default_telemetry(self):
         """Return safe default telemetry when vehicle is unavailable"""
-        return {
-            "timestamp": time.time(),
-            "position": {"latitude": 0.0, "longitude": 0.0, "altitude": 0.0},
-            "velocity": {"vx": 0.0, "vy": 0.0, "vz": 0.0},
-            "attitude": {"roll": 0.0, "pitch": 0.0, "yaw": 0.0},
-            "state": {"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN"},
-            "battery": {"voltage": 0.0, "current": 0.0, "level": -1},
-            "control": {"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN", "channels": {}},
-            "heartbeat": {"last_heartbeat": None, "armed": False},
-            "navigation": {"fix_type": 0, "satellites_visible": 0, "heading": 0, "groundspeed": 0, "airspeed": 0},
-            "valid_modes": {"modes": []},
-            "connection_status": "DISCONNECTED"
-        }
+        return DISCONNECTED_FRAME.replace(timestamp=time.time())
 
     def monitor_vehicle(self):
         """Continuously monitor vehicle status, heartbeat, and cache telemetry"""
@@ -425,12 +495,6 @@ class DroneConnection:
                         self.disconnect()
                         continue
 
-            # Update telemetry snapshot
-            if self.telemetry:
-                snapshot = self.telemetry.full_snapshot()
-                with self.lock:
-                    self.telemetry_snapshot = snapshot
-
             time.sleep(1)
 
     def _get_vehicle_state(self):
@@ -0,0 +1,341 @@
+import os
+import mmap
+import math
+import queue
+import struct
+import bisect
+import logging
+import threading
+from telemetry_frame import (
+    TelemetryFrame, Position, Velocity, Attitude, State, Battery, Control,
+    Heartbeat, HomeLocation, Navigation
+)
+
+RECORDER_MAGIC = b"DRFLIGHT"
+RECORDER_VERSION = 1
+
+# magic, version, record size, record count (rewritten after every append)
+HEADER = struct.Struct("<8sHHQ12x")
+COUNT_OFFSET = 12
+
+# One fixed-size little-endian record per frame:
+# timestamp, seq, lat/lon/alt, vx/vy/vz, roll/pitch/yaw, voltage/current/level,
+# heading/groundspeed/airspeed, fix type, satellites, flags, mode, system status,
+# RC channels 1-8, home lat/lon/alt, seconds since last heartbeat
+RECORD = struct.Struct("<dQ3d3f3f2fi3fBBB16s16s8H3df")
+
+FLAG_ARMED = 0x01
+FLAG_ARMABLE = 0x02
+FLAG_EKF_OK = 0x04
+
+# (timestamp, record index) entries written every index_interval records
+INDEX_ENTRY = struct.Struct("<dQ")
+
+NAN = float("nan")
+
+
+def _number(value):
+    return NAN if value is None else value
+
+
+def _optional(value):
+    return None if math.isnan(value) else value
+
+
+def _text(value):
+    return str(value).encode("ascii", "replace")[:16]
+
+
+def pack_frame(frame, timestamp=None):
+    """Pack a TelemetryFrame into a fixed-size record"""
+    nav = frame.navigation
+    home = nav.home_location
+    channels = frame.control.channels
+    flags = (
+        (FLAG_ARMED if frame.state.armed else 0)
+        | (FLAG_ARMABLE if nav.is_armable else 0)
+        | (FLAG_EKF_OK if nav.ekf_ok else 0)
+    )
+    return RECORD.pack(
+        frame.timestamp if timestamp is None else timestamp, frame.seq,
+        frame.position.latitude, frame.position.longitude, frame.position.altitude,
+        frame.velocity.vx, frame.velocity.vy, frame.velocity.vz,
+        frame.attitude.roll, frame.attitude.pitch, frame.attitude.yaw,
+        frame.battery.voltage, frame.battery.current, frame.battery.level,
+        _number(nav.heading), _number(nav.groundspeed), _number(nav.airspeed),
+        nav.fix_type & 0xFF, nav.satellites_visible & 0xFF, flags,
+        _text(frame.state.mode), _text(frame.state.system_status),
+        *(int(channels.get(str(i)) or 0) & 0xFFFF for i in range(1, 9)),
+        _number(home.lat), _number(home.lon), _number(home.alt),
+        _number(frame.heartbeat.last_heartbeat)
+    )
+
+
+def unpack_frame(buffer, offset=0):
+    """Rebuild a TelemetryFrame from a record (fields not recorded keep defaults)"""
+    (timestamp, seq, lat, lon, alt, vx, vy, vz, roll, pitch, yaw,
+     voltage, current, level, heading, groundspeed, airspeed,
+     fix_type, satellites, flags, mode, system_status,
+     c1, c2, c3, c4, c5, c6, c7, c8,
+     home_lat, home_lon, home_alt, last_heartbeat) = RECORD.unpack_from(buffer, offset)
+
+    armed = bool(flags & FLAG_ARMED)
+    mode = mode.rstrip(b"\0").decode("ascii")
+    system_status = system_status.rstrip(b"\0").decode("ascii")
+    channels = {str(i): value for i, value in enumerate((c1, c2, c3, c4, c5, c6, c7, c8), 1) if value}
+    return TelemetryFrame(
+        timestamp,
+        position=Position(lat, lon, alt),
+        velocity=Velocity(vx, vy, vz),
+        attitude=Attitude(roll, pitch, yaw),
+        state=State(armed, mode, system_status),
+        battery=Battery(voltage, current, level),
+        control=Control(armed, mode, system_status, channels),
+        heartbeat=Heartbeat(_optional(last_heartbeat), armed),
+        navigation=Navigation(
+            fix_type, satellites, heading, groundspeed, airspeed,
+            HomeLocation(_optional(home_lat), _optional(home_lon), _optional(home_alt)),
+            bool(flags & FLAG_ARMABLE), bool(flags & FLAG_EKF_OK)
+        ),
+        seq=seq
+    )
+
+
+class FlightRecorder:
+    """Append-only, memory-mapped flight log of fixed-size telemetry records.
+
+    ``record()`` only enqueues the frame; a background thread packs records
+    straight into the mapped file, which grows in ``grow_bytes`` steps. Every
+    ``index_interval`` records a (timestamp, index) entry is appended to the
+    ``<path>.idx`` sidecar so readers can seek without scanning. Opening an
+    existing log continues appending to it.
+    """
+
+    def __init__(self, path, queue_size=1024, grow_bytes=4 * 1024 * 1024,
+                 index_interval=256, flush_interval=1.0):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.grow_bytes = grow_bytes
+        self.index_interval = index_interval
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        self.file = None
+        self.index_file = None
+        self.mm = None
+        self.count = 0
+        self.last_timestamp = None
+
+        self.running = False
+        self.thread = None
+
+        # Accounting
+        self.records_written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self._open()
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            logging.info(f"🎥 Flight recorder writing to {self.path} ({self.count} existing records)")
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and threading.current_thread() != self.thread:
+            self.thread.join(timeout=5)
+        self.thread = None
+        self._close()
+        logging.info(f"Stopped flight recorder ({self.count} records in {self.path})")
+
+    def record(self, frame):
+        """Queue a frame for writing; never blocks the caller"""
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def _open(self):
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER.size
+        self.file = open(self.path, "r+b" if exists else "w+b")
+        if exists:
+            magic, version, record_size, count = HEADER.unpack(self.file.read(HEADER.size))
+            if magic != RECORDER_MAGIC or record_size != RECORD.size:
+                self.file.close()
+                raise ValueError(f"{self.path} is not a version {RECORDER_VERSION} flight log")
+            self.count = count
+        else:
+            self.file.write(HEADER.pack(RECORDER_MAGIC, RECORDER_VERSION, RECORD.size, 0))
+            self.count = 0
+
+        size = max(os.fstat(self.file.fileno()).st_size, HEADER.size + self.grow_bytes)
+        self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), size)
+        if self.count:
+            self.last_timestamp = struct.unpack_from("<d", self.mm, self._offset(self.count - 1))[0]
+        self.index_file = open(self.index_path, "ab")
+
+    def _close(self):
+        if self.mm is None:
+            return
+        used = self._offset(self.count)
+        self.mm.flush()
+        self.mm.close()
+        self.mm = None
+        # Drop the unused preallocated tail
+        self.file.truncate(used)
+        self.file.close()
+        self.index_file.close()
+
+    @staticmethod
+    def _offset(index):
+        return HEADER.size + index * RECORD.size
+
+    def _grow(self):
+        size = len(self.mm) + self.grow_bytes
+        self.mm.flush()
+        self.mm.close()
+        self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), size)
+
+    def _write(self, frame):
+        timestamp = frame.timestamp
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            # Keep records time-ordered if the wall clock steps backwards
+            timestamp = self.last_timestamp
+        offset = self._offset(self.count)
+        if offset + RECORD.size > len(self.mm):
+            self._grow()
+        self.mm[offset:offset + RECORD.size] = pack_frame(frame, timestamp)
+        if self.count % self.index_interval == 0:
+            self.index_file.write(INDEX_ENTRY.pack(timestamp, self.count))
+        self.count += 1
+        struct.pack_into("<Q", self.mm, COUNT_OFFSET, self.count)
+        self.last_timestamp = timestamp
+        self.records_written += 1
+
+    def _run(self):
+        while self.running or not self.queue.empty():
+            try:
+                frame = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush()
+                continue
+            try:
+                self._write(frame)
+            except Exception as e:
+                self.write_errors += 1
+                logging.error(f"Flight recorder write error: {e}")
+
+    def _flush(self):
+        try:
+            self.mm.flush()
+            self.index_file.flush()
+        except Exception as e:
+            logging.debug(f"Flight recorder flush error: {e}")
+
+    def get_stats(self):
+        """Get recorder statistics for monitoring"""
+        return {
+            "path": self.path,
+            "running": self.running,
+            "records": self.count,
+            "records_written": self.records_written,
+            "queue_depth": self.queue.qsize(),
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+            "bytes": self._offset(self.count)
+        }
+
+
+class FlightLog:
+    """Read-only view of a flight log written by FlightRecorder.
+
+    Timestamps are found by bisecting the sparse index and then the records of
+    one index block, so lookups touch O(log n) pages of the file.
+    """
+
+    def __init__(self, path, index_interval=256):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count = HEADER.unpack_from(self.mm, 0)
+        if magic != RECORDER_MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {RECORDER_VERSION} flight log")
+        self.count = min(count, (len(self.mm) - HEADER.size) // RECORD.size)
+        self._load_index(path + ".idx", index_interval)
+
+    def _load_index(self, index_path, index_interval):
+        self.index_times = []
+        self.index_positions = []
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                data = f.read()
+            for timestamp, position in INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % INDEX_ENTRY.size]):
+                if position < self.count:
+                    self.index_times.append(timestamp)
+                    self.index_positions.append(position)
+        if not self.index_positions:
+            # No sidecar: sample one record per block instead of reading them all
+            for position in range(0, self.count, index_interval):
+                self.index_times.append(self.timestamp_at(position))
+                self.index_positions.append(position)
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def timestamp_at(self, index):
+        return struct.unpack_from("<d", self.mm, HEADER.size + index * RECORD.size)[0]
+
+    def frame_at(self, index):
+        return unpack_frame(self.mm, HEADER.size + index * RECORD.size)
+
+    def _bisect(self, timestamp, right):
+        """Index of the first record with a timestamp > (right) or >= (left) ``timestamp``"""
+        # Narrow to one index block, then search the records inside it
+        search = bisect.bisect_right if right else bisect.bisect_left
+        block = search(self.index_times, timestamp) - 1
+        lo = self.index_positions[block] if block >= 0 else 0
+        hi = self.index_positions[block + 1] if block + 1 < len(self.index_positions) else self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t = self.timestamp_at(mid)
+            if t < timestamp or (right and t == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, timestamp):
+        """Index of the newest record at or before ``timestamp``, or -1"""
+        return self._bisect(timestamp, right=True) - 1
+
+    def frame_at_time(self, timestamp):
+        index = self.find(timestamp)
+        return self.frame_at(index) if index >= 0 else None
+
+    def frames(self, start=None, end=None):
+        """Yield frames with start <= timestamp <= end, oldest first"""
+        lo = 0 if start is None else self._bisect(start, right=False)
+        hi = self.count if end is None else self._bisect(end, right=True)
+        for index in range(lo, hi):
+            yield self.frame_at(index)
+
+    def start_time(self):
+        return self.timestamp_at(0) if self.count else None
+
+    def end_time(self):
+        return self.timestamp_at(self.count - 1) if self.count else None
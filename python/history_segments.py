@@ -0,0 +1,278 @@
+import os
+import json
+import lzma
+import zlib
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from telemetry_history import (
+    HISTORY_COLUMNS, COLUMN_NAMES, DECIMATION_COLUMNS, resolve_decimation, resample_columns, decimate_columns
+)
+
+CATALOG_VERSION = 1
+
+CODECS = {
+    "zlib": (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress)
+}
+
+# Columns stored as delta-encoded fixed-point integers: value * scale, rounded.
+# Timestamps keep microseconds, coordinates 1e-7 deg (MAVLink's own precision),
+# altitude millimeters. Other float columns are stored losslessly.
+FIXED_POINT_SCALES = {
+    "timestamp": 1e6,
+    "latitude": 1e7,
+    "longitude": 1e7,
+    "altitude": 1e3
+}
+
+COLUMN_DTYPES = {name: np.dtype(dtype) for name, dtype, _ in HISTORY_COLUMNS}
+
+
+def encode_column(name, column):
+    """Return (encoding, scale, raw bytes) for one column of a chunk"""
+    scale = FIXED_POINT_SCALES.get(name)
+    if column.dtype.kind in "iub":
+        values = column.astype(np.int64)
+        scale = 1
+    elif scale and np.isfinite(column).all():
+        values = np.round(column * scale).astype(np.int64)
+    else:
+        # Byte-shuffle floats so each byte plane compresses on its own
+        return "shuffle", None, column.astype(np.float64).view(np.uint8).reshape(-1, 8).T.tobytes()
+    return "delta", scale, np.diff(values, prepend=0).tobytes()
+
+
+def decode_column(name, encoding, scale, raw):
+    if encoding == "shuffle":
+        planes = np.frombuffer(raw, dtype=np.uint8).reshape(8, -1)
+        values = np.ascontiguousarray(planes.T).view(np.float64).ravel()
+    else:
+        values = np.cumsum(np.frombuffer(raw, dtype=np.int64))
+        values = values / scale if scale != 1 else values
+    return values.astype(COLUMN_DTYPES[name], copy=False)
+
+
+class SegmentStore:
+    """On-disk telemetry history in fixed-duration, per-column compressed chunks.
+
+    Rows are buffered in memory until a frame falls past the current chunk's
+    ``chunk_seconds`` window; the finished chunk is then encoded, compressed
+    and written by a single background thread, and listed in ``catalog.json``
+    with the byte range of every column. Queries read only the columns of the
+    chunks overlapping the requested time range, with a small LRU of decoded
+    columns for repeated scans.
+    """
+
+    def __init__(self, directory, chunk_seconds=60, codec="zlib", level=6, cache_columns=64):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        self.directory = directory
+        self.chunk_seconds = chunk_seconds
+        self.codec = codec
+        self.level = level
+        self.catalog_path = os.path.join(directory, "catalog.json")
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.chunks = []
+        self._starts = []
+        self.rows = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._load_catalog()
+
+        self._rows = {name: [] for name in COLUMN_NAMES}
+        self._chunk_start = None
+        self._last_timestamp = self.chunks[-1]["end"] if self.chunks else None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-segments")
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_columns = cache_columns
+
+        # Accounting
+        self.chunks_written = 0
+        self.write_errors = 0
+        self.columns_loaded = 0
+        self.cache_hits = 0
+
+    def _load_catalog(self):
+        if not os.path.exists(self.catalog_path):
+            return
+        with open(self.catalog_path) as f:
+            catalog = json.load(f)
+        self.chunks = sorted(catalog.get("chunks", []), key=lambda chunk: chunk["start"])
+        self._starts = [chunk["start"] for chunk in self.chunks]
+        for chunk in self.chunks:
+            self._count_chunk(chunk)
+
+    def _count_chunk(self, chunk):
+        self.rows += chunk["rows"]
+        self.raw_bytes += chunk["raw_bytes"]
+        self.stored_bytes += chunk["stored_bytes"]
+
+    def _save_catalog(self):
+        temp_path = self.catalog_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": CATALOG_VERSION, "chunks": self.chunks}, f)
+        os.replace(temp_path, self.catalog_path)
+
+    # Writing
+
+    def append(self, frame):
+        """Buffer one TelemetryFrame; hands a chunk to the writer when its window ends"""
+        timestamp = frame.timestamp
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            return
+        window = timestamp - timestamp % self.chunk_seconds
+        if self._chunk_start is not None and window != self._chunk_start:
+            self.flush()
+        self._chunk_start = window
+        self._last_timestamp = timestamp
+        for name, _, extract in HISTORY_COLUMNS:
+            self._rows[name].append(extract(frame))
+
+    def flush(self):
+        """Write out the chunk being buffered, if any"""
+        rows = self._rows
+        if not rows["timestamp"]:
+            return
+        self._rows = {name: [] for name in COLUMN_NAMES}
+        self._writer.submit(self._write_chunk, rows)
+
+    def close(self):
+        self.flush()
+        self._writer.shutdown(wait=True)
+
+    def _write_chunk(self, rows):
+        try:
+            compress = CODECS[self.codec][0]
+            start, end = rows["timestamp"][0], rows["timestamp"][-1]
+            file_name = f"chunk_{int(start * 1000)}.seg"
+            columns = {}
+            raw_bytes = 0
+            offset = 0
+            with open(os.path.join(self.directory, file_name), "wb") as f:
+                for name in COLUMN_NAMES:
+                    column = np.array(rows[name], dtype=COLUMN_DTYPES[name])
+                    raw_bytes += column.nbytes
+                    encoding, scale, raw = encode_column(name, column)
+                    blob = compress(raw, self.level)
+                    f.write(blob)
+                    columns[name] = {"offset": offset, "length": len(blob), "encoding": encoding, "scale": scale}
+                    offset += len(blob)
+
+            chunk = {
+                "file": file_name,
+                "start": start,
+                "end": end,
+                "rows": len(rows["timestamp"]),
+                "codec": self.codec,
+                "raw_bytes": raw_bytes,
+                "stored_bytes": offset,
+                "columns": columns
+            }
+            with self.lock:
+                i = bisect.bisect_right(self._starts, start)
+                self.chunks.insert(i, chunk)
+                self._starts.insert(i, start)
+                self._count_chunk(chunk)
+                self._save_catalog()
+            self.chunks_written += 1
+        except Exception as e:
+            self.write_errors += 1
+            logging.error(f"History segment write error: {e}")
+
+    # Reading
+
+    def _overlapping(self, start, end):
+        with self.lock:
+            lo = 0 if start is None else max(bisect.bisect_right(self._starts, start) - 1, 0)
+            hi = len(self.chunks) if end is None else bisect.bisect_right(self._starts, end)
+            return [chunk for chunk in self.chunks[lo:hi] if start is None or chunk["end"] >= start]
+
+    def _load_column(self, chunk, name):
+        key = (chunk["file"], name)
+        with self._cache_lock:
+            column = self._cache.get(key)
+            if column is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return column
+        meta = chunk["columns"][name]
+        with open(os.path.join(self.directory, chunk["file"]), "rb") as f:
+            f.seek(meta["offset"])
+            blob = f.read(meta["length"])
+        raw = CODECS[chunk["codec"]][1](blob)
+        column = decode_column(name, meta["encoding"], meta["scale"], raw)
+        with self._cache_lock:
+            self.columns_loaded += 1
+            self._cache[key] = column
+            if len(self._cache) > self.cache_columns:
+                self._cache.popitem(last=False)
+        return column
+
+    def scan(self, start=None, end=None, fields=None):
+        """Yield one dict of columns per chunk overlapping [start, end], oldest first"""
+        names = [name for name in (fields or COLUMN_NAMES) if name in COLUMN_DTYPES]
+        if "timestamp" not in names:
+            names.insert(0, "timestamp")
+        for chunk in self._overlapping(start, end):
+            timestamps = self._load_column(chunk, "timestamp")
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="right"))
+            if lo >= hi:
+                continue
+            yield {name: self._load_column(chunk, name)[lo:hi] for name in names}
+
+    def query(self, start=None, end=None, fields=None, interval=None, max_points=None, decimation=None):
+        """Like TelemetryHistory.query over the chunks on disk"""
+        decimation = resolve_decimation(decimation, fields)
+        names = [name for name in (fields or COLUMN_NAMES) if name in COLUMN_DTYPES]
+        if "timestamp" not in names:
+            names.insert(0, "timestamp")
+        needed = list(names)
+        if max_points:
+            needed += [name for name in DECIMATION_COLUMNS[decimation] if name not in needed]
+
+        parts = list(self.scan(start, end, needed))
+        data = {
+            name: np.concatenate([part[name] for part in parts]) if parts
+            else np.zeros(0, dtype=COLUMN_DTYPES[name])
+            for name in needed
+        }
+        if interval and interval > 0 and len(data["timestamp"]) > 1:
+            data = resample_columns(data, interval)
+        if max_points and len(data["timestamp"]) > max_points:
+            data = decimate_columns(data, int(max_points), decimation)
+        return {name: data[name] for name in names}
+
+    def query_json(self, start=None, end=None, fields=None, interval=None, max_points=None, decimation=None):
+        """query() with plain lists, ready for json.dumps"""
+        data = self.query(start, end, fields, interval, max_points, decimation)
+        return {name: column.tolist() for name, column in data.items()}
+
+    def get_stats(self):
+        """Get segment store statistics for monitoring"""
+        with self.lock:
+            return {
+                "directory": self.directory,
+                "codec": self.codec,
+                "chunk_seconds": self.chunk_seconds,
+                "chunks": len(self.chunks),
+                "rows": self.rows,
+                "buffered_rows": len(self._rows["timestamp"]),
+                "raw_bytes": self.raw_bytes,
+                "stored_bytes": self.stored_bytes,
+                "compression_ratio": self.raw_bytes / self.stored_bytes if self.stored_bytes else None,
+                "chunks_written": self.chunks_written,
+                "write_errors": self.write_errors,
+                "columns_loaded": self.columns_loaded,
+                "cache_hits": self.cache_hits,
+                "oldest": self.chunks[0]["start"] if self.chunks else None,
+                "newest": self.chunks[-1]["end"] if self.chunks else None
+            }
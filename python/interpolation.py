@@ -0,0 +1,51 @@
+import math
+
+
+def euler_to_quaternion(roll, pitch, yaw):
+    """Aerospace (ZYX) Euler angles in radians to a unit quaternion (w, x, y, z)"""
+    cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+    cp, sp = math.cos(pitch / 2), math.sin(pitch / 2)
+    cy, sy = math.cos(yaw / 2), math.sin(yaw / 2)
+    return (
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy
+    )
+
+
+def quaternion_to_euler(q):
+    """Unit quaternion (w, x, y, z) to (roll, pitch, yaw) in radians"""
+    w, x, y, z = q
+    roll = math.atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = math.asin(max(-1.0, min(1.0, 2 * (w * y - z * x))))
+    yaw = math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return roll, pitch, yaw
+
+
+def slerp(q0, q1, fraction):
+    """Spherical linear interpolation between unit quaternions along the shorter arc"""
+    dot = sum(a * b for a, b in zip(q0, q1))
+    if dot < 0:
+        q1 = tuple(-c for c in q1)
+        dot = -dot
+    if dot > 0.9995:
+        # Nearly parallel - normalized lerp avoids dividing by ~0
+        q = tuple(a + (b - a) * fraction for a, b in zip(q0, q1))
+        norm = math.sqrt(sum(c * c for c in q))
+        return tuple(c / norm for c in q)
+    theta = math.acos(dot)
+    s0 = math.sin((1 - fraction) * theta) / math.sin(theta)
+    s1 = math.sin(fraction * theta) / math.sin(theta)
+    return tuple(s0 * a + s1 * b for a, b in zip(q0, q1))
+
+
+def slerp_attitude(before, after, fraction):
+    """Interpolate two (roll, pitch, yaw) attitudes in radians"""
+    return quaternion_to_euler(slerp(euler_to_quaternion(*before), euler_to_quaternion(*after), fraction))
+
+
+def lerp_heading(before, after, fraction):
+    """Interpolate compass headings in degrees along the shorter turn"""
+    delta = (after - before + 180.0) % 360.0 - 180.0
+    return (before + delta * fraction) % 360.0
@@ -0,0 +1,374 @@
+import time
+import socket
+import threading
+import logging
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+from telemetry_frame import (
+    TelemetryFrame, GroupSequencer, FALLBACK_GROUPS, Position, Velocity, Attitude, Battery,
+    HomeLocation, EkfStatus, ValidModes
+)
+
+MAVLINK_V1_STX = 0xFE
+MAVLINK_V2_STX = 0xFD
+MAVLINK_IFLAG_SIGNED = 0x01
+
+
+class MavlinkEngine:
+    """Telemetry acquisition straight from a MAVLink stream via pymavlink.
+
+    Raw bytes are split into packets by header only; packets whose message id
+    we do not use are skipped without decoding. Decoded messages update the
+    current frame directly, bypassing dronekit's attribute layer. Derived
+    fields (ekf_ok, is_armable, valid_modes) are recomputed the way dronekit
+    does whenever the messages they depend on arrive.
+
+    The engine needs its own endpoint (e.g. a second MAVProxy/SITL output such
+    as ``udpin:0.0.0.0:14551``) because dronekit keeps the primary link.
+    """
+
+    def __init__(self, endpoint, baud=57600, seed=None):
+        self.endpoint = endpoint
+        self.baud = baud
+        self.mav = mavlink.MAVLink(None)
+        self.link = None
+
+        self.lock = threading.Lock()
+        self.groups = dict(FALLBACK_GROUPS)
+        if seed is not None:
+            # Starting values until the stream sends its own
+            for name in self.groups:
+                self.groups[name] = seed.group(name)
+        self.sequencer = GroupSequencer()
+        self._last_heartbeat_at = None
+        self._vehicle_type = None
+
+        self._handlers = {
+            mavlink.MAVLINK_MSG_ID_HEARTBEAT: self._on_heartbeat,
+            mavlink.MAVLINK_MSG_ID_ATTITUDE: self._on_attitude,
+            mavlink.MAVLINK_MSG_ID_GLOBAL_POSITION_INT: self._on_global_position_int,
+            mavlink.MAVLINK_MSG_ID_VFR_HUD: self._on_vfr_hud,
+            mavlink.MAVLINK_MSG_ID_SYS_STATUS: self._on_sys_status,
+            mavlink.MAVLINK_MSG_ID_RC_CHANNELS: self._on_rc_channels,
+            mavlink.MAVLINK_MSG_ID_GPS_RAW_INT: self._on_gps_raw_int,
+            mavlink.MAVLINK_MSG_ID_HOME_POSITION: self._on_home_position,
+            mavlink.MAVLINK_MSG_ID_EKF_STATUS_REPORT: self._on_ekf_status_report
+        }
+
+        self.running = False
+        self.thread = None
+        self._buffer = bytearray()
+
+        # Accounting
+        self.bytes_received = 0
+        self.packets_decoded = 0
+        self.packets_skipped = 0
+        self.bad_packets = 0
+        self.last_update = None
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.link = mavutil.mavlink_connection(self.endpoint, baud=self.baud)
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            logging.info(f"Started MAVLink acquisition engine on {self.endpoint}")
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and threading.current_thread() != self.thread:
+            self.thread.join(timeout=2)
+        self.thread = None
+        if self.link is not None:
+            try:
+                self.link.close()
+            except Exception as e:
+                logging.debug(f"Error closing MAVLink endpoint: {e}")
+            self.link = None
+        logging.info("Stopped MAVLink acquisition engine")
+
+    def _run(self):
+        while self.running:
+            try:
+                data = self.link.recv(4096)
+            except socket.timeout:
+                continue
+            except Exception as e:
+                if self.running:
+                    logging.error(f"MAVLink engine read error: {e}")
+                    time.sleep(0.5)
+                continue
+            if not data:
+                # Block until the link has more bytes instead of spinning
+                self.link.select(0.1)
+                continue
+            self.feed(data)
+
+    def feed(self, data):
+        """Consume raw bytes from the link, decoding only the packets we use"""
+        self.bytes_received += len(data)
+        buf = self._buffer
+        buf.extend(data)
+        size = len(buf)
+        i = 0
+
+        while i < size:
+            stx = buf[i]
+            if stx == MAVLINK_V1_STX:
+                if size - i < 6:
+                    break
+                total = buf[i + 1] + 8
+                msgid = buf[i + 5]
+            elif stx == MAVLINK_V2_STX:
+                if size - i < 10:
+                    break
+                total = buf[i + 1] + 12
+                if buf[i + 2] & MAVLINK_IFLAG_SIGNED:
+                    total += 13
+                msgid = buf[i + 7] | (buf[i + 8] << 8) | (buf[i + 9] << 16)
+            else:
+                # Not a packet start - resync on the next byte
+                i += 1
+                continue
+
+            if size - i < total:
+                break
+
+            handler = self._handlers.get(msgid)
+            if handler is None:
+                self.packets_skipped += 1
+                i += total
+                continue
+
+            try:
+                msg = self.mav.decode(buf[i:i + total])
+            except Exception:
+                # Bad CRC or a false start byte - resync on the next byte
+                self.bad_packets += 1
+                i += 1
+                continue
+
+            self.packets_decoded += 1
+            with self.lock:
+                handler(msg)
+                self.last_update = time.time()
+            i += total
+
+        del buf[:i]
+
+    def handle_message(self, msg):
+        """Apply an already decoded message (e.g. read from a .tlog); False if unused"""
+        handler = self._handlers.get(msg.get_msgId())
+        if handler is None:
+            return False
+        with self.lock:
+            handler(msg)
+            self.last_update = time.time()
+        return True
+
+    # Message handlers - called with self.lock held
+
+    def _on_heartbeat(self, msg):
+        # Only the autopilot's heartbeat describes the vehicle
+        if msg.type == mavlink.MAV_TYPE_GCS or msg.autopilot == mavlink.MAV_AUTOPILOT_INVALID:
+            return
+        armed = bool(msg.base_mode & mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+        mode = mavutil.mode_string_v10(msg)
+        state_enum = mavlink.enums["MAV_STATE"].get(msg.system_status)
+        system_status = state_enum.name.replace("MAV_STATE_", "") if state_enum else "UNKNOWN"
+
+        groups = self.groups
+        groups["state"] = groups["state"]._replace(armed=armed, mode=mode, system_status=system_status)
+        groups["control"] = groups["control"]._replace(armed=armed, mode=mode, system_status=system_status)
+        groups["heartbeat"] = groups["heartbeat"]._replace(armed=armed)
+        self._last_heartbeat_at = time.monotonic()
+        if msg.type != self._vehicle_type:
+            # The mode mapping only changes with the vehicle type
+            self._vehicle_type = msg.type
+            mapping = mavutil.mode_mapping_byname(msg.type)
+            if mapping:
+                groups["valid_modes"] = ValidModes(tuple(mapping.keys()))
+        self._update_derived()
+
+    def _on_attitude(self, msg):
+        self.groups["attitude"] = Attitude(msg.roll, msg.pitch, msg.yaw)
+
+    def _on_global_position_int(self, msg):
+        self.groups["position"] = Position(msg.lat / 1.0e7, msg.lon / 1.0e7, msg.alt / 1000.0)
+        self.groups["velocity"] = Velocity(msg.vx / 100.0, msg.vy / 100.0, msg.vz / 100.0)
+
+    def _on_vfr_hud(self, msg):
+        self.groups["navigation"] = self.groups["navigation"]._replace(
+            heading=msg.heading, groundspeed=msg.groundspeed, airspeed=msg.airspeed
+        )
+
+    def _on_sys_status(self, msg):
+        self.groups["battery"] = Battery(
+            msg.voltage_battery / 1000.0,
+            msg.current_battery / 100.0 if msg.current_battery != -1 else 0.0,
+            msg.battery_remaining
+        )
+
+    def _on_rc_channels(self, msg):
+        channels = {
+            str(i): getattr(msg, f"chan{i}_raw")
+            for i in range(1, min(msg.chancount, 18) + 1)
+        }
+        self.groups["control"] = self.groups["control"]._replace(channels=channels)
+
+    def _on_gps_raw_int(self, msg):
+        self.groups["navigation"] = self.groups["navigation"]._replace(
+            fix_type=msg.fix_type, satellites_visible=msg.satellites_visible
+        )
+        self._update_derived()
+
+    def _on_home_position(self, msg):
+        self.groups["navigation"] = self.groups["navigation"]._replace(
+            home_location=HomeLocation(msg.latitude / 1.0e7, msg.longitude / 1.0e7, msg.altitude / 1000.0)
+        )
+
+    def _on_ekf_status_report(self, msg):
+        ekf = self.groups["navigation"].ekf_detailed._replace(
+            ekf_constposmode=bool(msg.flags & mavlink.EKF_CONST_POS_MODE),
+            ekf_poshorizabs=bool(msg.flags & mavlink.EKF_POS_HORIZ_ABS),
+            ekf_predposhorizabs=bool(msg.flags & mavlink.EKF_PRED_POS_HORIZ_ABS)
+        )
+        self.groups["navigation"] = self.groups["navigation"]._replace(ekf_detailed=ekf)
+        self._update_derived()
+
+    def _update_derived(self):
+        """Recompute ekf_ok and is_armable from mode, arming, GPS fix and EKF flags (as dronekit)"""
+        nav = self.groups["navigation"]
+        ekf = nav.ekf_detailed
+        if self.groups["state"].armed:
+            ekf_ok = ekf.ekf_poshorizabs and not ekf.ekf_constposmode
+        else:
+            ekf_ok = ekf.ekf_poshorizabs or ekf.ekf_predposhorizabs
+        is_armable = (
+            self.groups["state"].mode != "INITIALISING"
+            and nav.fix_type > 1
+            and ekf.ekf_predposhorizabs
+        )
+        self.groups["navigation"] = nav._replace(
+            ekf_ok=ekf_ok, is_armable=is_armable, ekf_detailed=ekf._replace(ekf_ok=ekf_ok)
+        )
+
+    def snapshot_frame(self):
+        """Return the latest TelemetryFrame decoded from the stream"""
+        with self.lock:
+            # Stamped with the time of the last decoded message, so a silent stream ages
+            frame = TelemetryFrame.from_groups(self.last_update or time.time(), self.groups)
+            if self._last_heartbeat_at is not None:
+                frame.heartbeat = frame.heartbeat._replace(
+                    last_heartbeat=time.monotonic() - self._last_heartbeat_at
+                )
+        return self.sequencer.stamp(frame)
+
+    def snapshot(self, since=None):
+        return self.snapshot_frame().to_dict(since=since)
+
+    def get_stats(self):
+        """Get engine statistics for monitoring"""
+        return {
+            "endpoint": self.endpoint,
+            "running": self.running,
+            "bytes_received": self.bytes_received,
+            "packets_decoded": self.packets_decoded,
+            "packets_skipped": self.packets_skipped,
+            "bad_packets": self.bad_packets,
+            "last_update_age": time.time() - self.last_update if self.last_update else None
+        }
+
+
+class MavlinkUdpStandIn:
+    """Local UDP vehicle stand-in that sends generated MAVLink packets.
+
+    Emits the high-rate messages the engine decodes plus a few it should skip,
+    so the fast path can be exercised without a vehicle or SITL. ``fix_type``,
+    ``ekf_flags`` and ``home`` can be changed while it runs to simulate a GPS
+    loss, an EKF failure or a home reset.
+    """
+
+    def __init__(self, target=("127.0.0.1", 14551), rate_hz=50, system_id=1):
+        self.target = target
+        self.rate_hz = rate_hz
+        self.mav = mavlink.MAVLink(None, srcSystem=system_id, srcComponent=1)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.fix_type = 3
+        self.ekf_flags = mavlink.EKF_ATTITUDE | mavlink.EKF_POS_HORIZ_ABS | mavlink.EKF_PRED_POS_HORIZ_ABS
+        self.home = (28.6139, 77.2090, 216.0)
+        self.packets_sent = 0
+        self.running = False
+        self.thread = None
+
+    def packets(self, t):
+        """Generate one tick of packets for time ``t`` (seconds)"""
+        mav = self.mav
+        tick = int(t * 1000)
+        return [
+            mav.heartbeat_encode(
+                mavlink.MAV_TYPE_QUADROTOR, mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED | mavlink.MAV_MODE_FLAG_SAFETY_ARMED,
+                4, mavlink.MAV_STATE_ACTIVE
+            ).pack(mav),
+            mav.attitude_encode(tick, 0.1, -0.05, (t % 6.28), 0.0, 0.0, 0.0).pack(mav),
+            mav.global_position_int_encode(
+                tick, int(28.6139e7 + t * 100), int(77.2090e7 + t * 100),
+                216000, 10000, 150, -120, 0, int((t * 1000) % 36000)
+            ).pack(mav),
+            mav.vfr_hud_encode(1.6, 1.9, int(t * 10) % 360, 50, 10.0, 0.0).pack(mav),
+            mav.sys_status_encode(0, 0, 0, 500, 12400, 1500, 87, 0, 0, 0, 0, 0, 0).pack(mav),
+            mav.rc_channels_encode(tick, 8, *([1500] * 18), 255).pack(mav),
+            mav.gps_raw_int_encode(tick * 1000, self.fix_type, 286139000, 772090000, 216000, 100, 100, 190, 0, 12).pack(mav),
+            mav.home_position_encode(
+                int(self.home[0] * 1e7), int(self.home[1] * 1e7), int(self.home[2] * 1000),
+                0, 0, 0, [1, 0, 0, 0], 0, 0, 0
+            ).pack(mav),
+            mav.ekf_status_report_encode(self.ekf_flags, 0.1, 0.1, 0.1, 0.1, 0.0).pack(mav),
+            # Not used by the engine - must be skipped without decoding
+            mav.system_time_encode(tick * 1000, tick).pack(mav),
+            mav.raw_imu_encode(tick * 1000, 1, 2, 3, 4, 5, 6, 7, 8, 9).pack(mav)
+        ]
+
+    def send_tick(self, t=None):
+        for packet in self.packets(time.time() if t is None else t):
+            self.sock.sendto(packet, self.target)
+            self.packets_sent += 1
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+        self.sock.close()
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        start = time.time()
+        while self.running:
+            self.send_tick(time.time() - start)
+            time.sleep(interval)
+
+
+if __name__ == "__main__":
+    # Replay generated packets into a local engine and report decode statistics
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    engine = MavlinkEngine("udpin:127.0.0.1:14551")
+    engine.start()
+    stand_in = MavlinkUdpStandIn(("127.0.0.1", 14551), rate_hz=50)
+    stand_in.start()
+    try:
+        for _ in range(5):
+            time.sleep(1)
+            frame = engine.snapshot_frame()
+            logging.info(f"Attitude: {frame.attitude}, Position: {frame.position}")
+            logging.info(f"Engine stats: {engine.get_stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stand_in.stop()
+        engine.stop()
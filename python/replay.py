@@ -0,0 +1,266 @@
+import time
+import asyncio
+import logging
+import argparse
+import threading
+from telemetry_frame import DISCONNECTED_FRAME, GroupSequencer, TelemetryFrame
+from telemetry_history import TelemetryHistory
+from rolling_stats import RollingAggregates
+from flight_recorder import FlightLog
+
+
+def flight_log_frames(path, start=None, end=None):
+    """Yield the frames of a FlightRecorder log, oldest first"""
+    with FlightLog(path) as log:
+        yield from log.frames(start, end)
+
+
+def tlog_frames(path, frame_interval=0.1):
+    """Yield frames decoded from a MAVLink .tlog, one per ``frame_interval`` of log time"""
+    from pymavlink import mavutil
+    from mavlink_engine import MavlinkEngine
+
+    engine = MavlinkEngine(path)
+    mlog = mavutil.mavlink_connection(path)
+    last_heartbeat = None
+    next_emit = None
+    try:
+        while True:
+            msg = mlog.recv_msg()
+            if msg is None:
+                break
+            if not engine.handle_message(msg):
+                continue
+            timestamp = msg._timestamp
+            if msg.get_type() == "HEARTBEAT":
+                last_heartbeat = timestamp
+            if next_emit is None:
+                next_emit = timestamp
+            if timestamp < next_emit:
+                continue
+            next_emit = timestamp + frame_interval
+            frame = TelemetryFrame.from_groups(timestamp, engine.groups)
+            if last_heartbeat is not None:
+                frame.heartbeat = frame.heartbeat._replace(last_heartbeat=timestamp - last_heartbeat)
+            yield frame
+    finally:
+        mlog.close()
+
+
+def open_recording(path, **kwargs):
+    """Frame iterator for a recording, chosen by file extension"""
+    if path.endswith(".tlog"):
+        return tlog_frames(path, **kwargs)
+    return flight_log_frames(path, **kwargs)
+
+
+class ReplayConnection:
+    """Stands in for DroneConnection and streams a recorded flight.
+
+    Frames are published at the recorded pace divided by ``speed`` (1, 10, ...);
+    ``speed=None`` publishes as fast as possible. Published frames are stamped
+    with the wall clock so freshness checks behave as with a live vehicle.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False, history_max_samples=1_000_000):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+        self.vehicle = None
+        self.is_connected = False
+        self.telemetry_source = None
+        self.recorder = None
+        self.segments = None
+        self.history = TelemetryHistory(max_samples=history_max_samples)
+        self.rolling = RollingAggregates()
+        self.telemetry_snapshot = None
+        self.sequencer = GroupSequencer()
+
+        self.running = False
+        self.thread = None
+
+        # Accounting
+        self.frames_published = 0
+        self.loops_completed = 0
+        self.recorded_time = None  # recorded timestamp of the last published frame
+        self.started_at = None
+        self.finished_at = None
+        self.max_lag = 0.0
+        # Set when a non-loop replay plays to the end; reconnect attempts then
+        # leave it finished instead of restarting playback
+        self.completed = False
+
+    # DroneConnection interface
+
+    def connect_with_retry(self, connection_string=None, baud=None):
+        """Start playback; the connection arguments are ignored"""
+        if self.completed:
+            logging.debug("Replay already finished - not restarting")
+            return False
+        if self.thread is None or not self.thread.is_alive():
+            self.running = True
+            self.is_connected = True
+            self.vehicle = self.path
+            self.telemetry_source = self
+            self.started_at = time.monotonic()
+            self.finished_at = None
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            logging.info(f"▶️ Replaying {self.path} at {self._speed_label()}")
+        return True
+
+    connect = connect_with_retry
+
+    def disconnect(self):
+        self.running = False
+        if self.thread is not None and threading.current_thread() != self.thread:
+            self.thread.join(timeout=5)
+        self.thread = None
+        self.is_connected = False
+        self.vehicle = None
+        self.telemetry_source = None
+        # An explicit disconnect/connect replays the recording again
+        self.completed = False
+        logging.info(f"⏹️ Replay stopped: {self.get_stats()}")
+
+    def get_frame(self):
+        frame = self.telemetry_snapshot
+        if frame is None:
+            return DISCONNECTED_FRAME.replace(timestamp=time.time())
+        if not self.is_connected:
+            return frame.replace(connection_status="DISCONNECTED")
+        return frame
+
+    def get_snapshot(self, since=None):
+        return self.get_frame().to_dict(since=since)
+
+    def get_history(self, start=None, end=None, fields=None, interval=None, max_points=None, decimation=None,
+                    bbox=None, near=None, archive=False):
+        if archive:
+            raise ValueError("No on-disk history during replay")
+        return self.history.query_json(start, end, fields, interval, max_points, decimation, bbox, near)
+
+    def telemetry_at(self, timestamp):
+        return self.history.telemetry_at(timestamp)
+
+    def get_circuit_breaker_status(self):
+        return {}
+
+    def get_cache_stats(self):
+        # Replays keep no frame cache
+        return None
+
+    def get_publication_stats(self):
+        frame = self.telemetry_snapshot
+        return {
+            "acquisition_mode": "replay",
+            "acquiring": self.running,
+            "publish_count": self.frames_published,
+            "last_publish_age": time.time() - frame.timestamp if frame else None
+        }
+
+    # Playback
+
+    def _speed_label(self):
+        return f"{self.speed}x" if self.speed else "max speed"
+
+    def _run(self):
+        try:
+            while self.running:
+                self._play_once()
+                if not self.loop:
+                    self.completed = self.running
+                    break
+                self.loops_completed += 1
+        except Exception as e:
+            logging.error(f"Replay error: {e}")
+        finally:
+            self.finished_at = time.monotonic()
+            self.running = False
+            self.is_connected = False
+            logging.info(f"🏁 Replay finished: {self.get_stats()}")
+
+    def _play_once(self):
+        first_recorded = None
+        wall_start = time.monotonic()
+        for frame in open_recording(self.path):
+            if not self.running:
+                return
+            if first_recorded is None:
+                first_recorded = frame.timestamp
+            if self.speed:
+                due = wall_start + (frame.timestamp - first_recorded) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+            self._publish(frame)
+
+    def _publish(self, frame):
+        self.recorded_time = frame.timestamp
+        frame = self.sequencer.stamp(frame.replace(timestamp=time.time(), connection_status="CONNECTED"))
+        self.telemetry_snapshot = frame
+        self.history.append(frame)
+        self.rolling.update(frame)
+        self.frames_published += 1
+
+    def get_stats(self):
+        """Get replay statistics; frames_per_second is comparable between runs"""
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            "path": self.path,
+            "speed": self.speed,
+            "running": self.running,
+            "loop": self.loop,
+            "loops_completed": self.loops_completed,
+            "completed": self.completed,
+            "frames_published": self.frames_published,
+            "recorded_time": self.recorded_time,
+            "elapsed_seconds": elapsed,
+            "frames_per_second": self.frames_published / elapsed if elapsed else 0.0,
+            "max_lag_seconds": self.max_lag
+        }
+
+
+if __name__ == "__main__":
+    # Serve a recorded flight over the regular WebSocket server, e.g.
+    #   python replay.py flight.bin --speed 10 --broadcast-interval 0.05
+    from ws_server import WebSocketServer
+
+    parser = argparse.ArgumentParser(description="Replay a recorded flight through the WebSocket server")
+    parser.add_argument("recording", help="FlightRecorder log or MAVLink .tlog")
+    parser.add_argument("--speed", default="1", help="playback speed multiplier, or 'max'")
+    parser.add_argument("--loop", action="store_true", help="restart the recording when it ends")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--broadcast-interval", type=float, default=1.0)
+    parser.add_argument("--keyframe-interval", type=float, default=10.0,
+                        help="seconds between keyframes for patch-mode clients")
+    parser.add_argument("--no-compression", action="store_true", help="disable permessage-deflate")
+    parser.add_argument("--compression-window-bits", type=int, default=12)
+    parser.add_argument("--compression-mem-level", type=int, default=5)
+    parser.add_argument("--compression-min-size", type=int, default=0,
+                        help="send messages shorter than this uncompressed")
+    args = parser.parse_args()
+
+    replay = ReplayConnection(
+        args.recording,
+        speed=None if args.speed == "max" else float(args.speed),
+        loop=args.loop
+    )
+    server = WebSocketServer(args.host, args.port, drone_connection=replay,
+                             broadcast_interval=args.broadcast_interval,
+                             keyframe_interval=args.keyframe_interval,
+                             compression=not args.no_compression,
+                             compression_window_bits=args.compression_window_bits,
+                             compression_mem_level=args.compression_mem_level,
+                             compression_min_size=args.compression_min_size)
+    try:
+        asyncio.run(server.start_server())
+    except KeyboardInterrupt:
+        logging.info("⌨️ Replay stopped by user")
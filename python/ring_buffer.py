@@ -0,0 +1,231 @@
+import sys
+import time
+from typing import Any, Callable, Optional
+
+
+def deep_getsizeof(obj, _seen=None) -> int:
+    """Bytes held by ``obj`` and everything it references, each object counted once.
+
+    Follows tuples, lists, dicts and __slots__; None and bools are free.
+    """
+    if obj is None or obj is True or obj is False:
+        return 0
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float)):
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_getsizeof(key, seen) + deep_getsizeof(value, seen)
+    elif isinstance(obj, (tuple, list, set, frozenset)):
+        for item in obj:
+            size += deep_getsizeof(item, seen)
+    for name in getattr(type(obj), "__slots__", ()):
+        size += deep_getsizeof(getattr(obj, name, None), seen)
+    return size
+
+
+def top_level_parts(obj) -> tuple:
+    """Objects referenced directly by ``obj``: __slots__ values, sequence items or dict values"""
+    if isinstance(obj, (tuple, list)):
+        return tuple(obj)
+    if isinstance(obj, dict):
+        return tuple(obj.values())
+    return tuple(getattr(obj, name, None) for name in getattr(type(obj), "__slots__", ()))
+
+
+class TelemetryRingBuffer:
+    """Fixed-capacity, time-ordered ring of (timestamp, item) entries.
+
+    Storage is preallocated. Appending and evicting the oldest entry are O(1),
+    lookups by time are O(log n) binary searches, and TTL expiry happens lazily
+    from the old end on append and on every read (against the wall clock), so
+    reads never return expired entries even when appends have stopped.
+
+    Each entry is measured once when it is appended and kept in a running
+    ``total_bytes``; with ``max_bytes`` the oldest entries are also evicted to
+    stay within that byte budget. By default the parts an entry references
+    (e.g. a frame's group records) are reference counted across entries, so a
+    record shared by many frames is counted once and released with the last
+    entry holding it. A custom ``sizer`` sizes each entry on its own instead.
+    """
+
+    def __init__(self, capacity: int, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, sizer: Optional[Callable[[Any], int]] = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self._timestamps = [0.0] * capacity
+        self._items: list = [None] * capacity
+        self._sizes = [0] * capacity
+        self._parts: list = [()] * capacity
+        # id of a part held by some entry -> [entries holding it, its size]
+        self._shared = {}
+        self._start = 0   # physical index of the oldest entry
+        self._count = 0
+        self.total_bytes = 0
+        self.evicted = 0
+        self.expired = 0
+        self.budget_evicted = 0
+
+    def __len__(self):
+        return self._count
+
+    def _index(self, i: int) -> int:
+        """Physical slot of the i-th oldest entry"""
+        return (self._start + i) % self.capacity
+
+    def _pop_oldest(self):
+        slot = self._start
+        item = self._items[slot]
+        self._items[slot] = None
+        self.total_bytes -= self._sizes[slot]
+        self._sizes[slot] = 0
+        for part_id in self._parts[slot]:
+            ref = self._shared[part_id]
+            ref[0] -= 1
+            if not ref[0]:
+                self.total_bytes -= ref[1]
+                del self._shared[part_id]
+        self._parts[slot] = ()
+        self._start = (slot + 1) % self.capacity
+        self._count -= 1
+        return item
+
+    def append(self, timestamp: float, item: Any):
+        """Add an entry, overwriting the oldest one when full"""
+        if self._count and timestamp < self.newest_timestamp():
+            # Keep the ring sorted if the wall clock steps backwards
+            timestamp = self.newest_timestamp()
+        if self._count == self.capacity:
+            self._pop_oldest()
+            self.evicted += 1
+        slot = self._index(self._count)
+        self._timestamps[slot] = timestamp
+        self._items[slot] = item
+        if self.sizer is not None:
+            self._sizes[slot] = self.sizer(item)
+        else:
+            self._sizes[slot], self._parts[slot] = self._hold_parts(item)
+        self.total_bytes += self._sizes[slot]
+        self._count += 1
+        if self.max_bytes is not None:
+            # Always keep the new entry, even if it alone exceeds the budget
+            while self._count > 1 and self.total_bytes > self.max_bytes:
+                self._pop_oldest()
+                self.budget_evicted += 1
+        self.evict_expired(timestamp)
+
+    def _hold_parts(self, item):
+        """Count ``item``'s parts as held; returns (own size, part ids)"""
+        part_ids = []
+        for part in top_level_parts(item):
+            if part is None or part is True or part is False:
+                continue
+            part_id = id(part)
+            ref = self._shared.get(part_id)
+            if ref is None:
+                size = deep_getsizeof(part)
+                self._shared[part_id] = [1, size]
+                self.total_bytes += size
+            else:
+                ref[0] += 1
+            part_ids.append(part_id)
+        return sys.getsizeof(item), tuple(part_ids)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop entries older than the TTL; only touches expired entries"""
+        if self.ttl is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.ttl
+        removed = 0
+        while self._count and self._timestamps[self._start] < cutoff:
+            self._pop_oldest()
+            removed += 1
+        self.expired += removed
+        return removed
+
+    def pop_oldest(self):
+        """Remove and return the oldest (timestamp, item), or None when empty"""
+        if not self._count:
+            return None
+        timestamp = self._timestamps[self._start]
+        return timestamp, self._pop_oldest()
+
+    def clear(self):
+        self._items = [None] * self.capacity
+        self._sizes = [0] * self.capacity
+        self._parts = [()] * self.capacity
+        self._shared = {}
+        self._start = 0
+        self._count = 0
+        self.total_bytes = 0
+
+    def oldest_timestamp(self) -> Optional[float]:
+        return self._timestamps[self._start] if self._count else None
+
+    def newest_timestamp(self) -> Optional[float]:
+        return self._timestamps[self._index(self._count - 1)] if self._count else None
+
+    def latest(self):
+        """Newest (timestamp, item), or None when empty"""
+        self.evict_expired()
+        if not self._count:
+            return None
+        slot = self._index(self._count - 1)
+        return self._timestamps[slot], self._items[slot]
+
+    def _bisect_right(self, timestamp: float) -> int:
+        """Number of entries with a timestamp <= ``timestamp``"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[self._index(mid)] <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _bisect_left(self, timestamp: float) -> int:
+        """Number of entries with a timestamp < ``timestamp``"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[self._index(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def at_or_before(self, timestamp: float):
+        """Newest (timestamp, item) not later than ``timestamp``, or None"""
+        self.evict_expired()
+        i = self._bisect_right(timestamp) - 1
+        if i < 0:
+            return None
+        slot = self._index(i)
+        return self._timestamps[slot], self._items[slot]
+
+    def range(self, start: float, end: float) -> list:
+        """All (timestamp, item) entries with start <= timestamp <= end, oldest first"""
+        self.evict_expired()
+        lo = self._bisect_left(start)
+        hi = self._bisect_right(end)
+        return [
+            (self._timestamps[self._index(i)], self._items[self._index(i)])
+            for i in range(lo, hi)
+        ]
+
+    def items(self) -> list:
+        """All (timestamp, item) entries, oldest first"""
+        self.evict_expired()
+        return [
+            (self._timestamps[self._index(i)], self._items[self._index(i)])
+            for i in range(self._count)
+        ]
@@ -0,0 +1,112 @@
+import math
+import time
+import threading
+from collections import deque
+
+
+# Fields tracked by RollingAggregates: name -> extractor from a TelemetryFrame
+ROLLING_FIELDS = {
+    "altitude": lambda f: f.position.altitude,
+    "groundspeed": lambda f: f.navigation.groundspeed,
+    "voltage": lambda f: f.battery.voltage,
+    "current": lambda f: f.battery.current,
+    "satellites_visible": lambda f: f.navigation.satellites_visible
+}
+
+ROLLING_WINDOWS = (10, 60, 600)
+
+
+class RollingWindow:
+    """Min/max/mean/stddev of the samples in the last ``seconds``, in amortized O(1).
+
+    Mean and variance use Welford updates that also support removal; min and
+    max come from monotonic deques whose front is always the extreme value.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()
+        self.minimums = deque()
+        self.maximums = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, timestamp, value):
+        self.samples.append((timestamp, value))
+        count = len(self.samples)
+        delta = value - self.mean
+        self.mean += delta / count
+        self.m2 += delta * (value - self.mean)
+
+        while self.minimums and self.minimums[-1][1] >= value:
+            self.minimums.pop()
+        self.minimums.append((timestamp, value))
+        while self.maximums and self.maximums[-1][1] <= value:
+            self.maximums.pop()
+        self.maximums.append((timestamp, value))
+        self.expire(timestamp)
+
+    def expire(self, now):
+        cutoff = now - self.seconds
+        samples = self.samples
+        while samples and samples[0][0] < cutoff:
+            _, value = samples.popleft()
+            count = len(samples)
+            if count == 0:
+                self.mean = 0.0
+                self.m2 = 0.0
+            else:
+                delta = value - self.mean
+                self.mean -= delta / count
+                self.m2 -= delta * (value - self.mean)
+        while self.minimums and self.minimums[0][0] < cutoff:
+            self.minimums.popleft()
+        while self.maximums and self.maximums[0][0] < cutoff:
+            self.maximums.popleft()
+
+    def stats(self):
+        count = len(self.samples)
+        if not count:
+            return {"count": 0, "min": None, "max": None, "mean": None, "stddev": None}
+        return {
+            "count": count,
+            "min": self.minimums[0][1],
+            "max": self.maximums[0][1],
+            "mean": self.mean,
+            "stddev": math.sqrt(max(self.m2, 0.0) / count)
+        }
+
+
+class RollingAggregates:
+    """Rolling windows of key telemetry fields, updated once per published frame"""
+
+    def __init__(self, windows=ROLLING_WINDOWS, fields=None):
+        self.fields = dict(fields or ROLLING_FIELDS)
+        self.windows = tuple(windows)
+        self.lock = threading.Lock()
+        self.rolling = {
+            name: {seconds: RollingWindow(seconds) for seconds in self.windows}
+            for name in self.fields
+        }
+
+    def update(self, frame):
+        timestamp = frame.timestamp
+        with self.lock:
+            for name, extract in self.fields.items():
+                value = extract(frame)
+                if value is None or value != value:
+                    continue
+                for window in self.rolling[name].values():
+                    window.add(timestamp, float(value))
+
+    def get_stats(self, now=None):
+        """{field: {"10s": {count, min, max, mean, stddev}, ...}}"""
+        now = time.time() if now is None else now
+        with self.lock:
+            result = {}
+            for name, windows in self.rolling.items():
+                result[name] = {}
+                for seconds, window in windows.items():
+                    window.expire(now)
+                    result[name][f"{seconds}s"] = window.stats()
+            return result
@@ -0,0 +1,86 @@
+import math
+import bisect
+import itertools
+import numpy as np
+
+METERS_PER_DEGREE = 111320.0
+EARTH_RADIUS_M = 6371000.0
+
+
+class GridIndex:
+    """Uniform lat/lon grid of sample ids, updated as positions arrive.
+
+    Ids must be appended in increasing order, so each cell's list stays sorted
+    and old ids can be pruned from the front. Queries visit only the cells that
+    overlap the box and return candidate ids for an exact filter.
+    """
+
+    def __init__(self, cell_size=0.001):
+        # 0.001 deg is ~111 m of latitude
+        self.cell_size = cell_size
+        self.cells = {}
+        self.indexed = 0
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def insert(self, sample_id, lat, lon):
+        if math.isnan(lat) or math.isnan(lon) or (lat == 0.0 and lon == 0.0):
+            # No fix yet
+            return
+        key = self._cell(lat, lon)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [sample_id]
+        else:
+            bucket.append(sample_id)
+        self.indexed += 1
+
+    def prune(self, first_id):
+        """Forget ids below ``first_id``"""
+        for key in list(self.cells):
+            bucket = self.cells[key]
+            cut = bisect.bisect_left(bucket, first_id)
+            if cut == len(bucket):
+                del self.cells[key]
+            elif cut:
+                del bucket[:cut]
+            self.indexed -= cut
+
+    def candidates(self, min_lat, min_lon, max_lat, max_lon):
+        """Ids in every cell overlapping the box (a superset of the exact answer)"""
+        lat_lo, lon_lo = self._cell(min_lat, min_lon)
+        lat_hi, lon_hi = self._cell(max_lat, max_lon)
+        span = (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1)
+        if span > len(self.cells):
+            # Box covers more cells than exist - walk the occupied ones instead
+            buckets = [
+                bucket for (cell_lat, cell_lon), bucket in self.cells.items()
+                if lat_lo <= cell_lat <= lat_hi and lon_lo <= cell_lon <= lon_hi
+            ]
+        else:
+            cells = self.cells
+            buckets = [
+                cells[key]
+                for key in itertools.product(range(lat_lo, lat_hi + 1), range(lon_lo, lon_hi + 1))
+                if key in cells
+            ]
+        return np.fromiter(itertools.chain.from_iterable(buckets), dtype=np.int64)
+
+    def get_stats(self):
+        return {"cell_size": self.cell_size, "cells": len(self.cells), "indexed": self.indexed}
+
+
+def radius_bbox(lat, lon, radius_m):
+    """Lat/lon box enclosing a circle of ``radius_m`` meters"""
+    dlat = radius_m / METERS_PER_DEGREE
+    dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def haversine_m(lat, lon, lats, lons):
+    """Great-circle distance in meters from one point to arrays of points"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
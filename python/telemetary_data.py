@@ -2,281 +2,357 @@ import time
 import threading
 from contextlib import contextmanager
 import logging
+from pymavlink import mavutil
+from worker_pool import vehicle_access_pool, PoolSaturatedError
+from telemetry_frame import (
+    TelemetryFrame, GroupSequencer, FALLBACK_GROUPS, Position, Velocity, Attitude, State,
+    Battery, Control, Heartbeat, HomeLocation, EkfStatus, Navigation, ValidModes
+)
+
 class TimeoutError(Exception):
     pass
 
+_TIMED_OUT = object()
+
 def safe_vehicle_access(func, timeout_seconds=0.5, default_value=None):
-    """Thread-safe vehicle access with very short timeout protection"""
-    result = [None]
-    exception = [None]
-    
-    def target():
-        try:
-            result[0] = func()
-        except Exception as e:
-            exception[0] = e
-    
-    thread = threading.Thread(target=target)
-    thread.daemon = True  # Ensure thread dies when main program exits
-    thread.start()
-    thread.join(timeout=timeout_seconds)
-    
-    if thread.is_alive():
-        # Thread is still running, it's stuck - return default immediately
-        print(f"⚠️ Vehicle access timed out after {timeout_seconds}s - using fallback")
+    """Vehicle access on the shared worker pool with very short timeout protection"""
+    try:
+        result = vehicle_access_pool.run(func, timeout=timeout_seconds, default=_TIMED_OUT)
+    except PoolSaturatedError as e:
+        print(f"⚠️ Vehicle access rejected ({e}) - using fallback")
         return default_value
-    
-    if exception[0]:
-        print(f"❌ Vehicle access error: {exception[0]} - using fallback")
+    except Exception as e:
+        print(f"❌ Vehicle access error: {e} - using fallback")
         return default_value
-    
-    return result[0]
+
+    if result is _TIMED_OUT:
+        # Worker is still running, it's stuck - return default immediately
+        print(f"⚠️ Vehicle access timed out after {timeout_seconds}s - using fallback")
+        return default_value
+
+    return result
 
 class TelemetryData:
-    def __init__(self, vehicle):
+    def __init__(self, vehicle, snapshot_deadline=None):
         self.vehicle = vehicle
+        # When set, full_snapshot reads all groups concurrently and never takes
+        # longer than this many seconds; late groups reuse their last good value
+        self.snapshot_deadline = snapshot_deadline
+        self.last_good = {}
+        self.sequencer = GroupSequencer()
 
-    def position(self):
-        def get_position():
-            loc = self.vehicle.location.global_frame
+        # Per-connection memo for values that almost never change in flight
+        # (valid modes, home location); see watch_invalidations()
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self._vehicle_type = None
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.memo_invalidations = 0
+        self._watching = False
+
+    def _memoized(self, key, loader, cache_none=True):
+        with self._memo_lock:
+            if key in self._memo:
+                self.memo_hits += 1
+                return self._memo[key]
+            self.memo_misses += 1
+        value = loader()
+        if value is not None or cache_none:
+            with self._memo_lock:
+                self._memo[key] = value
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one memoized value, or all of them when key is None"""
+        with self._memo_lock:
+            if key is None:
+                dropped = len(self._memo)
+                self._memo.clear()
+            else:
+                dropped = 1 if self._memo.pop(key, None) is not None else 0
+            self.memo_invalidations += dropped
+
+    def watch_invalidations(self):
+        """Invalidate memoized values on HOME_POSITION and vehicle-type changes"""
+        if self._watching:
+            return
+        self.vehicle.add_message_listener('HOME_POSITION', self._on_home_position)
+        self.vehicle.add_message_listener('HEARTBEAT', self._on_heartbeat_type)
+        self._watching = True
+
+    def unwatch_invalidations(self):
+        if not self._watching:
+            return
+        try:
+            self.vehicle.remove_message_listener('HOME_POSITION', self._on_home_position)
+            self.vehicle.remove_message_listener('HEARTBEAT', self._on_heartbeat_type)
+        except Exception as e:
+            logging.debug(f"Error removing memo listeners: {e}")
+        self._watching = False
+
+    def _on_home_position(self, vehicle, name, message):
+        self.invalidate('home_location')
+
+    def _on_heartbeat_type(self, vehicle, name, message):
+        # Only the vehicle's autopilot heartbeat counts, as in dronekit: a GCS or
+        # companion computer on the link would otherwise flip the type every beat
+        if (message.type == mavutil.mavlink.MAV_TYPE_GCS
+                or message.autopilot == mavutil.mavlink.MAV_AUTOPILOT_INVALID):
+            return
+        target_system = getattr(getattr(vehicle, '_master', None), 'target_system', None)
+        if target_system and message.get_srcSystem() != target_system:
+            return
+        vehicle_type = message.type
+        if vehicle_type != self._vehicle_type:
+            if self._vehicle_type is not None:
+                logging.info(f"Vehicle type changed {self._vehicle_type} -> {vehicle_type}, dropping memoized values")
+                self.invalidate()
+            self._vehicle_type = vehicle_type
+
+    def get_memo_stats(self):
+        """Get memoization counters for monitoring"""
+        with self._memo_lock:
+            lookups = self.memo_hits + self.memo_misses
             return {
-                "latitude": loc.lat if loc.lat is not None else 0.0,
-                "longitude": loc.lon if loc.lon is not None else 0.0,
-                "altitude": loc.alt if loc.alt is not None else 0.0
+                "entries": len(self._memo),
+                "hits": self.memo_hits,
+                "misses": self.memo_misses,
+                "invalidations": self.memo_invalidations,
+                "hit_rate_percent": (self.memo_hits / lookups) * 100 if lookups else 0
             }
-        
-        return safe_vehicle_access(
-            get_position, 
-            timeout_seconds=0.5, 
-            default_value={"latitude": 0.0, "longitude": 0.0, "altitude": 0.0}
+
+    # Raw readers - each one touches the vehicle object directly and must be
+    # run through safe_vehicle_access so a hung link cannot block the caller.
+
+    def _read_position(self):
+        loc = self.vehicle.location.global_frame
+        return Position(
+            loc.lat if loc.lat is not None else 0.0,
+            loc.lon if loc.lon is not None else 0.0,
+            loc.alt if loc.alt is not None else 0.0
         )
 
-    def velocity(self):
-        def get_velocity():
-            vx, vy, vz = self.vehicle.velocity
-            return {
-                "vx": vx if vx is not None else 0.0, 
-                "vy": vy if vy is not None else 0.0, 
-                "vz": vz if vz is not None else 0.0
-            }
-        
-        return safe_vehicle_access(
-            get_velocity, 
-            timeout_seconds=2, 
-            default_value={"vx": 0.0, "vy": 0.0, "vz": 0.0}
+    def _read_velocity(self):
+        vx, vy, vz = self.vehicle.velocity
+        return Velocity(
+            vx if vx is not None else 0.0, 
+            vy if vy is not None else 0.0, 
+            vz if vz is not None else 0.0
         )
 
-    def attitude(self):
-        def get_attitude():
-            att = self.vehicle.attitude
-            
-            return {
-                "roll": att.roll if att.roll is not None else 0.0, 
-                "pitch": att.pitch if att.pitch is not None else 0.0, 
-                "yaw": att.yaw if att.yaw is not None else 0.0
-            }
+    def _read_attitude(self):
+        att = self.vehicle.attitude
         
-        return safe_vehicle_access(
-            get_attitude, 
-            timeout_seconds=2, 
-            default_value={"roll": 0.0, "pitch": 0.0, "yaw": 0.0}
+        return Attitude(
+            att.roll if att.roll is not None else 0.0, 
+            att.pitch if att.pitch is not None else 0.0, 
+            att.yaw if att.yaw is not None else 0.0
         )
 
-    def state(self):
-        def get_state():
-            return {
-                "armed": self.vehicle.armed if self.vehicle.armed is not None else False,
-                "mode": self.vehicle.mode.name if self.vehicle.mode and self.vehicle.mode.name else "UNKNOWN",
-                "system_status": self.vehicle.system_status.state if self.vehicle.system_status and self.vehicle.system_status.state else "UNKNOWN"
-            }
-        
-        return safe_vehicle_access(
-            get_state, 
-            timeout_seconds=2, 
-            default_value={"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN"}
+    def _read_state(self):
+        return State(
+            self.vehicle.armed if self.vehicle.armed is not None else False,
+            self.vehicle.mode.name if self.vehicle.mode and self.vehicle.mode.name else "UNKNOWN",
+            self.vehicle.system_status.state if self.vehicle.system_status and self.vehicle.system_status.state else "UNKNOWN"
         )
 
-    def battery_power(self):
-        def get_battery():
-            batt = self.vehicle.battery
-            return {
-                "voltage" : batt.voltage if batt.voltage is not None else 0.0,
-                "current": batt.current if batt.current is not None else 0.0,
-                "level": batt.level if batt.level is not None else -1
-            }
-        
-        return safe_vehicle_access(
-            get_battery, 
-            timeout_seconds=2, 
-            default_value={"voltage": 0.0, "current": 0.0, "level": -1}
+    def _read_battery(self):
+        batt = self.vehicle.battery
+        return Battery(
+            batt.voltage if batt.voltage is not None else 0.0,
+            batt.current if batt.current is not None else 0.0,
+            batt.level if batt.level is not None else -1
         )
 
-    def control(self):
-        def get_control():
-            return {
-                "armed": self.vehicle.armed if self.vehicle.armed is not None else False,
-                "mode": self.vehicle.mode.name if self.vehicle.mode and self.vehicle.mode.name else "UNKNOWN",
-                "system_status": self.vehicle.system_status.state if self.vehicle.system_status and self.vehicle.system_status.state else "UNKNOWN",
-                "channels": dict(self.vehicle.channels) if self.vehicle.channels else {}
-            }
-        
-        return safe_vehicle_access(
-            get_control, 
-            timeout_seconds=2, 
-            default_value={"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN", "channels": {}}
+    def _read_control(self):
+        return Control(
+            self.vehicle.armed if self.vehicle.armed is not None else False,
+            self.vehicle.mode.name if self.vehicle.mode and self.vehicle.mode.name else "UNKNOWN",
+            self.vehicle.system_status.state if self.vehicle.system_status and self.vehicle.system_status.state else "UNKNOWN",
+            dict(self.vehicle.channels) if self.vehicle.channels else {}
         )
 
-    def heartbeat(self):
-        def get_heartbeat():
-            return {
-                "last_heartbeat": self.vehicle.last_heartbeat,
-                "armed": self.vehicle.armed if self.vehicle.armed is not None else False
-            }
-        
-        return safe_vehicle_access(
-            get_heartbeat, 
-            timeout_seconds=2, 
-            default_value={"last_heartbeat": None, "armed": False}
+    def _read_heartbeat(self):
+        return Heartbeat(
+            self.vehicle.last_heartbeat,
+            self.vehicle.armed if self.vehicle.armed is not None else False
         )
 
-    def navigation(self):
-        def get_navigation():
-            gps = self.vehicle.gps_0
-            
-            # Get detailed EKF status
-            ekf_status = {
-                "ekf_ok": self.vehicle.ekf_ok if hasattr(self.vehicle, 'ekf_ok') else False,
-                "ekf_constposmode": getattr(self.vehicle, '_ekf_constposmode', False),
-                "ekf_poshorizabs": getattr(self.vehicle, '_ekf_poshorizabs', False),
-                "ekf_predposhorizabs": getattr(self.vehicle, '_ekf_predposhorizabs', False)
-            }
-            
-            return {
-                "fix_type": gps.fix_type if gps and gps.fix_type is not None else 0,
-                "satellites_visible": gps.satellites_visible if gps and gps.satellites_visible is not None else 0,
-                "heading": self.vehicle.heading if self.vehicle.heading is not None else 0,
-                "groundspeed": self.vehicle.groundspeed if self.vehicle.groundspeed is not None else 0,
-                "airspeed": self.vehicle.airspeed if self.vehicle.airspeed is not None else 0,
-                "home_location": {
-                    "lat": self.vehicle.home_location.lat if self.vehicle.home_location else None,
-                    "lon": self.vehicle.home_location.lon if self.vehicle.home_location else None,
-                    "alt": self.vehicle.home_location.alt if self.vehicle.home_location else None
-                },
-                "is_armable": self.vehicle.is_armable if self.vehicle.is_armable is not None else False,
-                "ekf_ok": ekf_status["ekf_ok"],
-                "ekf_detailed": ekf_status
-            }
+    def _read_navigation(self):
+        gps = self.vehicle.gps_0
         
-        return safe_vehicle_access(
-            get_navigation, 
-            timeout_seconds=2, 
-            default_value={
-                "fix_type": 0, "satellites_visible": 0, "heading": 0, 
-                "groundspeed": 0, "airspeed": 0, "home_location": {"lat": None, "lon": None, "alt": None},
-                "is_armable": False, "ekf_ok": False,
-                "ekf_detailed": {
-                    "ekf_ok": False,
-                    "ekf_constposmode": False,
-                    "ekf_poshorizabs": False,
-                    "ekf_predposhorizabs": False
-                }
-            }
+        # Get detailed EKF status
+        ekf_status = EkfStatus(
+            self.vehicle.ekf_ok if hasattr(self.vehicle, 'ekf_ok') else False,
+            getattr(self.vehicle, '_ekf_constposmode', False),
+            getattr(self.vehicle, '_ekf_poshorizabs', False),
+            getattr(self.vehicle, '_ekf_predposhorizabs', False)
         )
-
-    def valid_flight_modes(self):
-        def get_flight_modes():
-            # Try the old method first for backward compatibility
-            if hasattr(self.vehicle, 'mode_mapping'):
-                return {"modes": list(self.vehicle.mode_mapping().keys())}
-            else:
-                # Fallback to common ArduPilot flight modes for different vehicle types
-                # These are the most common modes supported by ArduPilot
-                common_modes = [
-                    "STABILIZE", "ACRO", "ALT_HOLD", "AUTO", "GUIDED", 
-                    "LOITER", "RTL", "CIRCLE", "LAND", "DRIFT", 
-                    "SPORT", "FLIP", "AUTOTUNE", "POSHOLD", "BRAKE",
-                    "THROW", "AVOID_ADSB", "GUIDED_NOGPS", "SMART_RTL"
-                ]
-                
-                try:
-                    if hasattr(self.vehicle, 'parameters') and self.vehicle.parameters:
-                        # For now, return common modes - could be enhanced to read actual supported modes
-                        return {"modes": common_modes[:8]}  # Return first 8 common modes
-                    else:
-                        return {"modes": common_modes[:8]}  # Return first 8 common modes
-                except:
-                    return {"modes": common_modes[:8]}  # Return first 8 common modes
         
-        return safe_vehicle_access(
-            get_flight_modes, 
-            timeout_seconds=2, 
-            default_value={"modes": ["STABILIZE", "GUIDED", "AUTO", "RTL", "LAND"]}
+        return Navigation(
+            fix_type=gps.fix_type if gps and gps.fix_type is not None else 0,
+            satellites_visible=gps.satellites_visible if gps and gps.satellites_visible is not None else 0,
+            heading=self.vehicle.heading if self.vehicle.heading is not None else 0,
+            groundspeed=self.vehicle.groundspeed if self.vehicle.groundspeed is not None else 0,
+            airspeed=self.vehicle.airspeed if self.vehicle.airspeed is not None else 0,
+            home_location=self._home_location(),
+            is_armable=self.vehicle.is_armable if self.vehicle.is_armable is not None else False,
+            ekf_ok=ekf_status.ekf_ok,
+            ekf_detailed=ekf_status
         )
 
-    def full_snapshot(self):
-        """Return a complete snapshot using simple sequential approach with aggressive timeouts"""
-        import logging
-        
-        snapshot = {
-            "timestamp": time.time(),
-            "connection_status": "CONNECTED"
-        }
-        
-        # Define all telemetry methods with very short timeouts
-        telemetry_methods = [
-            ('position', self.position),
-            ('velocity', self.velocity), 
-            ('attitude', self.attitude),
-            ('state', self.state),
-            ('battery', self.battery_power),
-            ('control', self.control),
-            ('heartbeat', self.heartbeat),
-            ('navigation', self.navigation),
-            ('valid_modes', self.valid_flight_modes)
+    def _home_location(self):
+        def load_home():
+            home = self.vehicle.home_location
+            if not home:
+                return None
+            return HomeLocation(home.lat, home.lon, home.alt)
+
+        # Home is unknown until the vehicle reports it, so only a real value is cached
+        home = self._memoized('home_location', load_home, cache_none=False)
+        return home if home is not None else HomeLocation()
+
+    def _read_valid_modes(self):
+        return self._memoized('valid_modes', self._load_valid_modes)
+
+    def _load_valid_modes(self):
+        # Try the old method first for backward compatibility
+        if hasattr(self.vehicle, 'mode_mapping'):
+            return ValidModes(tuple(self.vehicle.mode_mapping().keys()))
+        else:
+            # Fallback to common ArduPilot flight modes for different vehicle types
+            # These are the most common modes supported by ArduPilot
+            common_modes = [
+                "STABILIZE", "ACRO", "ALT_HOLD", "AUTO", "GUIDED", 
+                "LOITER", "RTL", "CIRCLE", "LAND", "DRIFT", 
+                "SPORT", "FLIP", "AUTOTUNE", "POSHOLD", "BRAKE",
+                "THROW", "AVOID_ADSB", "GUIDED_NOGPS", "SMART_RTL"
+            ]
+            
+            try:
+                if hasattr(self.vehicle, 'parameters') and self.vehicle.parameters:
+                    # For now, return common modes - could be enhanced to read actual supported modes
+                    return ValidModes(tuple(common_modes[:8]))  # Return first 8 common modes
+                else:
+                    return ValidModes(tuple(common_modes[:8]))  # Return first 8 common modes
+            except:
+                return ValidModes(tuple(common_modes[:8]))  # Return first 8 common modes
+
+    def position(self):
+        return safe_vehicle_access(self._read_position, timeout_seconds=0.5, default_value=FALLBACK_GROUPS["position"])
+
+    def velocity(self):
+        return safe_vehicle_access(self._read_velocity, timeout_seconds=2, default_value=FALLBACK_GROUPS["velocity"])
+
+    def attitude(self):
+        return safe_vehicle_access(self._read_attitude, timeout_seconds=2, default_value=FALLBACK_GROUPS["attitude"])
+
+    def state(self):
+        return safe_vehicle_access(self._read_state, timeout_seconds=2, default_value=FALLBACK_GROUPS["state"])
+
+    def battery_power(self):
+        return safe_vehicle_access(self._read_battery, timeout_seconds=2, default_value=FALLBACK_GROUPS["battery"])
+
+    def control(self):
+        return safe_vehicle_access(self._read_control, timeout_seconds=2, default_value=FALLBACK_GROUPS["control"])
+
+    def heartbeat(self):
+        return safe_vehicle_access(self._read_heartbeat, timeout_seconds=2, default_value=FALLBACK_GROUPS["heartbeat"])
+
+    def navigation(self):
+        return safe_vehicle_access(self._read_navigation, timeout_seconds=2, default_value=FALLBACK_GROUPS["navigation"])
+
+    def valid_flight_modes(self):
+        return safe_vehicle_access(self._read_valid_modes, timeout_seconds=2, default_value=FALLBACK_GROUPS["valid_modes"])
+
+    def _telemetry_methods(self):
+        # Raw readers are submitted once each so a snapshot costs one pooled
+        # call per group instead of a nested pair of threads
+        return [
+            ('position', self._read_position),
+            ('velocity', self._read_velocity), 
+            ('attitude', self._read_attitude),
+            ('state', self._read_state),
+            ('battery', self._read_battery),
+            ('control', self._read_control),
+            ('heartbeat', self._read_heartbeat),
+            ('navigation', self._read_navigation),
+            ('valid_modes', self._read_valid_modes)
         ]
-        
-        for name, method in telemetry_methods:
+
+    def _fallback(self, name):
+        """Last good value for a group, or its shared safe default"""
+        return self.last_good.get(name, FALLBACK_GROUPS[name])
+
+    def full_snapshot(self, since=None):
+        """Return a complete snapshot as a dict (see snapshot_frame).
+
+        With ``since``, only groups that changed after that sequence are included.
+        """
+        return self.snapshot_frame().to_dict(since=since)
+
+    def snapshot_frame(self):
+        """Return a complete TelemetryFrame using simple sequential approach with aggressive timeouts"""
+        if self.snapshot_deadline is not None:
+            return self.concurrent_snapshot(self.snapshot_deadline)
+
+        groups = {}
+        for name, method in self._telemetry_methods():
             try:
                 result = safe_vehicle_access(method, timeout_seconds=0.5, default_value=None)
                 
                 if result is not None:
-                    snapshot[name] = result
+                    groups[name] = result
+                    self.last_good[name] = result
                     logging.debug(f"✅ Got {name}: {result}")
                 else:
-                    fallbacks = {
-                        'position': {"latitude": 0.0, "longitude": 0.0, "altitude": 0.0},
-                        'velocity': {"vx": 0.0, "vy": 0.0, "vz": 0.0},
-                        'attitude': {"roll": 0.0, "pitch": 0.0, "yaw": 0.0},
-                        'state': {"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN"},
-                        'battery': {"voltage": 0.0, "current": 0.0, "level": -1},
-                        'control': {"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN", "channels": {}},
-                        'heartbeat': {"last_heartbeat": None, "armed": False},
-                        'navigation': {"fix_type": 0, "satellites_visible": 0, "heading": 0, "groundspeed": 0, "airspeed": 0, "home_location": {"lat": None, "lon": None, "alt": None}, "is_armable": False, "ekf_ok": False, "ekf_detailed": {"ekf_ok": False, "ekf_constposmode": False, "ekf_poshorizabs": False, "ekf_predposhorizabs": False}},
-                        'valid_modes': {"modes": ["STABILIZE", "GUIDED", "AUTO", "RTL", "LAND"]}
-                    }
-                    snapshot[name] = fallbacks.get(name, {})
+                    groups[name] = FALLBACK_GROUPS[name]
                     logging.warning(f"⚠️ Using fallback for {name}")
                     
             except Exception as e:
                 logging.error(f"❌ Error getting {name}: {e}")
-                fallbacks = {
-                    'position': {"latitude": 0.0, "longitude": 0.0, "altitude": 0.0},
-                    'velocity': {"vx": 0.0, "vy": 0.0, "vz": 0.0},
-                    'attitude': {"roll": 0.0, "pitch": 0.0, "yaw": 0.0},
-                    'state': {"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN"},
-                    'battery': {"voltage": 0.0, "current": 0.0, "level": -1},
-                    'control': {"armed": False, "mode": "UNKNOWN", "system_status": "UNKNOWN", "channels": {}},
-                    'heartbeat': {"last_heartbeat": None, "armed": False},
-                    'navigation': {"fix_type": 0, "satellites_visible": 0, "heading": 0, "groundspeed": 0, "airspeed": 0, "home_location": {"lat": None, "lon": None, "alt": None}, "is_armable": False, "ekf_ok": False, "ekf_detailed": {"ekf_ok": False, "ekf_constposmode": False, "ekf_poshorizabs": False, "ekf_predposhorizabs": False}},
-                    'valid_modes': {"modes": ["STABILIZE", "GUIDED", "AUTO", "RTL", "LAND"]}
-                }
-                snapshot[name] = fallbacks.get(name, {})
-        
-        required_fields = ['position', 'velocity', 'attitude', 'state', 'battery', 'control', 'heartbeat', 'navigation', 'valid_modes']
-        for field in required_fields:
-            if field not in snapshot:
-                snapshot[field] = {}
+                groups[name] = FALLBACK_GROUPS[name]
         
-        logging.info(f"Snapshot collected with {len(snapshot)} fields in <1s")
-        logging.debug(f"Full snapshot: {snapshot}")
-        return snapshot
+        frame = self.sequencer.stamp(TelemetryFrame.from_groups(time.time(), groups))
+        logging.debug(f"Snapshot collected with {len(groups)} groups in <1s")
+        return frame
+
+    def concurrent_snapshot(self, deadline_seconds):
+        """Read all groups at once under a single deadline.
+
+        Groups that miss the deadline are filled from their last good value and
+        listed in ``stale_groups``.
+        """
+        timestamp = time.time()
+        deadline = time.monotonic() + deadline_seconds
+        methods = self._telemetry_methods()
+
+        tasks = {}
+        for name, method in methods:
+            try:
+                tasks[name] = vehicle_access_pool.submit(method)
+            except PoolSaturatedError as e:
+                logging.warning(f"⚠️ Could not submit {name}: {e}")
+
+        groups = {}
+        stale_groups = []
+        for name, _ in methods:
+            task = tasks.get(name)
+            if task is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+                if not task.done.wait(remaining) and vehicle_access_pool.abandon(task):
+                    task = None
+            if task is not None and task.exception is None and task.result is not None:
+                groups[name] = task.result
+                self.last_good[name] = task.result
+            else:
+                if task is not None and task.exception is not None:
+                    logging.error(f"❌ Error getting {name}: {task.exception}")
+                groups[name] = self._fallback(name)
+                stale_groups.append(name)
+
+        if stale_groups:
+            logging.warning(f"⚠️ Snapshot deadline {deadline_seconds}s missed for {stale_groups} - using last good values")
+        frame = TelemetryFrame.from_groups(timestamp, groups, stale_groups=tuple(stale_groups))
+        return self.sequencer.stamp(frame)
@@ -0,0 +1,119 @@
+import json
+import time
+
+
+def merge_diff(old, new):
+    """JSON merge-patch (RFC 7386) that turns ``old`` into ``new``.
+
+    Only changed leaves are included; keys missing from ``new`` become null and
+    lists are replaced whole. As in any merge patch, a leaf that changes to
+    null reads as a removed key on the client.
+    """
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        previous = old[key]
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = merge_diff(previous, value)
+            if nested:
+                patch[key] = nested
+        elif value != previous or type(value) is not type(previous):
+            patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+def apply_merge_patch(target, patch):
+    """Apply a JSON merge-patch to ``target`` in place and return it"""
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict):
+            current = target.get(key)
+            if not isinstance(current, dict):
+                current = target[key] = {}
+            apply_merge_patch(current, value)
+        else:
+            target[key] = value
+    return target
+
+
+class DeltaStream:
+    """Sequence-numbered keyframes and merge-patches of the broadcast snapshot.
+
+    ``advance`` is called once per broadcast tick: it diffs the new snapshot
+    against the previous one and encodes the patch once for every client. The
+    keyframe for a tick is only encoded if some client needs one.
+    """
+
+    def __init__(self, keyframe_interval=10.0):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.base = None
+        self._patch = None
+        self._keyframe = None
+
+        # Accounting
+        self.patches = 0
+        self.keyframes = 0
+        self.patch_bytes = 0
+        self.keyframe_bytes = 0
+        self.last_patch_bytes = None
+
+    def advance(self, snapshot):
+        """Start a new tick with ``snapshot``"""
+        previous = self.base
+        self.seq += 1
+        self.base = snapshot
+        self._keyframe = None
+        if previous is None:
+            self._patch = None
+            return
+        self._patch = json.dumps({
+            "type": "patch",
+            "seq": self.seq,
+            "base": self.seq - 1,
+            "patch": merge_diff(previous, snapshot)
+        })
+        self.last_patch_bytes = len(self._patch)
+
+    def message_for(self, channel, now=None):
+        """The message a patch-mode client should get this tick: a patch when it
+        holds the previous tick, otherwise a keyframe"""
+        now = time.monotonic() if now is None else now
+        if (
+            self._patch is None
+            or channel.needs_keyframe
+            or "telemetry" in channel.latest  # the unsent frame it would replace is this patch's base
+            or now - channel.last_keyframe >= self.keyframe_interval
+        ):
+            if self._keyframe is None:
+                self._keyframe = json.dumps({"type": "keyframe", "seq": self.seq, "data": self.base})
+            channel.needs_keyframe = False
+            channel.last_keyframe = now
+            self.keyframes += 1
+            self.keyframe_bytes += len(self._keyframe)
+            return self._keyframe
+        self.patches += 1
+        self.patch_bytes += len(self._patch)
+        return self._patch
+
+    def get_stats(self):
+        """Get delta stream statistics for monitoring"""
+        sent_bytes = self.patch_bytes + self.keyframe_bytes
+        return {
+            "seq": self.seq,
+            "keyframe_interval": self.keyframe_interval,
+            "patches_sent": self.patches,
+            "keyframes_sent": self.keyframes,
+            "patch_bytes": self.patch_bytes,
+            "keyframe_bytes": self.keyframe_bytes,
+            "last_patch_bytes": self.last_patch_bytes,
+            "avg_patch_bytes": self.patch_bytes / self.patches if self.patches else None,
+            "avg_keyframe_bytes": self.keyframe_bytes / self.keyframes if self.keyframes else None,
+            "bytes_per_message": sent_bytes / (self.patches + self.keyframes) if sent_bytes else None
+        }
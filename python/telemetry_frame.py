@@ -0,0 +1,277 @@
+import itertools
+import threading
+from typing import NamedTuple, Optional, Any
+
+
+# Telemetry groups are immutable tuple-backed records, so defaults and
+# fallbacks can be shared between frames without copying. Dicts are only
+# built by to_dict() at the serialization boundary.
+
+class Position(NamedTuple):
+    latitude: float = 0.0
+    longitude: float = 0.0
+    altitude: float = 0.0
+
+    def to_dict(self):
+        return {"latitude": self.latitude, "longitude": self.longitude, "altitude": self.altitude}
+
+
+class Velocity(NamedTuple):
+    vx: float = 0.0
+    vy: float = 0.0
+    vz: float = 0.0
+
+    def to_dict(self):
+        return {"vx": self.vx, "vy": self.vy, "vz": self.vz}
+
+
+class Attitude(NamedTuple):
+    roll: float = 0.0
+    pitch: float = 0.0
+    yaw: float = 0.0
+
+    def to_dict(self):
+        return {"roll": self.roll, "pitch": self.pitch, "yaw": self.yaw}
+
+
+class State(NamedTuple):
+    armed: bool = False
+    mode: str = "UNKNOWN"
+    system_status: str = "UNKNOWN"
+
+    def to_dict(self):
+        return {"armed": self.armed, "mode": self.mode, "system_status": self.system_status}
+
+
+class Battery(NamedTuple):
+    voltage: float = 0.0
+    current: float = 0.0
+    level: int = -1
+
+    def to_dict(self):
+        return {"voltage": self.voltage, "current": self.current, "level": self.level}
+
+
+class Control(NamedTuple):
+    armed: bool = False
+    mode: str = "UNKNOWN"
+    system_status: str = "UNKNOWN"
+    # Treated as read-only; writers always install a fresh dict
+    channels: dict = {}
+
+    def to_dict(self):
+        return {
+            "armed": self.armed,
+            "mode": self.mode,
+            "system_status": self.system_status,
+            "channels": dict(self.channels)
+        }
+
+
+class Heartbeat(NamedTuple):
+    last_heartbeat: Any = None
+    armed: bool = False
+
+    def to_dict(self):
+        return {"last_heartbeat": self.last_heartbeat, "armed": self.armed}
+
+
+class HomeLocation(NamedTuple):
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    alt: Optional[float] = None
+
+    def to_dict(self):
+        return {"lat": self.lat, "lon": self.lon, "alt": self.alt}
+
+
+class EkfStatus(NamedTuple):
+    ekf_ok: bool = False
+    ekf_constposmode: bool = False
+    ekf_poshorizabs: bool = False
+    ekf_predposhorizabs: bool = False
+
+    def to_dict(self):
+        return {
+            "ekf_ok": self.ekf_ok,
+            "ekf_constposmode": self.ekf_constposmode,
+            "ekf_poshorizabs": self.ekf_poshorizabs,
+            "ekf_predposhorizabs": self.ekf_predposhorizabs
+        }
+
+
+class Navigation(NamedTuple):
+    fix_type: int = 0
+    satellites_visible: int = 0
+    heading: float = 0
+    groundspeed: float = 0
+    airspeed: float = 0
+    home_location: HomeLocation = HomeLocation()
+    is_armable: bool = False
+    ekf_ok: bool = False
+    ekf_detailed: EkfStatus = EkfStatus()
+
+    def to_dict(self):
+        return {
+            "fix_type": self.fix_type,
+            "satellites_visible": self.satellites_visible,
+            "heading": self.heading,
+            "groundspeed": self.groundspeed,
+            "airspeed": self.airspeed,
+            "home_location": self.home_location.to_dict(),
+            "is_armable": self.is_armable,
+            "ekf_ok": self.ekf_ok,
+            "ekf_detailed": self.ekf_detailed.to_dict()
+        }
+
+
+class ValidModes(NamedTuple):
+    modes: tuple = ("STABILIZE", "GUIDED", "AUTO", "RTL", "LAND")
+
+    def to_dict(self):
+        return {"modes": list(self.modes)}
+
+
+GROUP_NAMES = (
+    "position", "velocity", "attitude", "state", "battery",
+    "control", "heartbeat", "navigation", "valid_modes"
+)
+
+# Safe per-group values used when a group cannot be read
+FALLBACK_GROUPS = {
+    "position": Position(),
+    "velocity": Velocity(),
+    "attitude": Attitude(),
+    "state": State(),
+    "battery": Battery(),
+    "control": Control(),
+    "heartbeat": Heartbeat(),
+    "navigation": Navigation(),
+    "valid_modes": ValidModes()
+}
+
+
+class TelemetryFrame:
+    """Canonical in-process telemetry snapshot.
+
+    Frames are treated as immutable once built; use ``replace()`` to derive a
+    frame with a different timestamp or status.
+    """
+
+    __slots__ = ("timestamp", "connection_status") + GROUP_NAMES + ("stale_groups", "seq", "group_seqs")
+
+    def __init__(
+        self,
+        timestamp: float,
+        connection_status: str = "CONNECTED",
+        position: Position = FALLBACK_GROUPS["position"],
+        velocity: Velocity = FALLBACK_GROUPS["velocity"],
+        attitude: Attitude = FALLBACK_GROUPS["attitude"],
+        state: State = FALLBACK_GROUPS["state"],
+        battery: Battery = FALLBACK_GROUPS["battery"],
+        control: Control = FALLBACK_GROUPS["control"],
+        heartbeat: Heartbeat = FALLBACK_GROUPS["heartbeat"],
+        navigation: Navigation = FALLBACK_GROUPS["navigation"],
+        valid_modes: ValidModes = FALLBACK_GROUPS["valid_modes"],
+        stale_groups: Optional[tuple] = None,
+        seq: int = 0,
+        group_seqs: tuple = (0,) * len(GROUP_NAMES)
+    ):
+        self.timestamp = timestamp
+        self.connection_status = connection_status
+        self.position = position
+        self.velocity = velocity
+        self.attitude = attitude
+        self.state = state
+        self.battery = battery
+        self.control = control
+        self.heartbeat = heartbeat
+        self.navigation = navigation
+        self.valid_modes = valid_modes
+        self.stale_groups = stale_groups
+        # Sequence of the newest group change in this frame, and the sequence at
+        # which each group (in GROUP_NAMES order) last changed
+        self.seq = seq
+        self.group_seqs = group_seqs
+
+    @classmethod
+    def from_groups(cls, timestamp, groups, connection_status="CONNECTED", stale_groups=None):
+        """Build a frame from a {group name: record} mapping"""
+        frame = cls(timestamp, connection_status, stale_groups=stale_groups)
+        for name, value in groups.items():
+            setattr(frame, name, value)
+        return frame
+
+    def replace(self, **changes):
+        """Return a copy of this frame with some fields replaced"""
+        frame = TelemetryFrame.__new__(TelemetryFrame)
+        for name in TelemetryFrame.__slots__:
+            setattr(frame, name, changes.get(name, getattr(self, name)))
+        return frame
+
+    def group(self, name):
+        return getattr(self, name)
+
+    def changed_since(self, since):
+        """Names of the groups that changed after sequence ``since``"""
+        return [
+            name for name, group_seq in zip(GROUP_NAMES, self.group_seqs)
+            if group_seq > since
+        ]
+
+    def to_dict(self, since=None):
+        """Serialize to the nested dict layout sent to clients.
+
+        With ``since``, only groups that changed after that sequence are included.
+        """
+        data = {
+            "timestamp": self.timestamp,
+            "connection_status": self.connection_status,
+            "seq": self.seq
+        }
+        if since is None:
+            names = GROUP_NAMES
+        else:
+            names = self.changed_since(since)
+            data["since"] = since
+        for name in names:
+            data[name] = getattr(self, name).to_dict()
+        if self.stale_groups is not None:
+            data["stale_groups"] = list(self.stale_groups)
+        return data
+
+
+# Process-wide so sequence numbers keep increasing across reconnects
+_sequence = itertools.count(1)
+
+
+class GroupSequencer:
+    """Stamps frames with a sequence number for every group whose value changed"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_values = {}
+        self.group_seqs = dict.fromkeys(GROUP_NAMES, 0)
+        self.seq = 0
+
+    def stamp(self, frame):
+        """Set ``seq`` and ``group_seqs`` on a freshly built frame"""
+        with self.lock:
+            for name in GROUP_NAMES:
+                value = getattr(frame, name)
+                if self.last_values.get(name) != value:
+                    self.last_values[name] = value
+                    self.seq = next(_sequence)
+                    self.group_seqs[name] = self.seq
+            frame.seq = self.seq
+            frame.group_seqs = tuple(self.group_seqs.values())
+        return frame
+
+
+# Shared frame served when no vehicle is available; callers must replace()
+# the timestamp rather than mutate it
+DISCONNECTED_FRAME = TelemetryFrame(
+    timestamp=0.0,
+    connection_status="DISCONNECTED",
+    valid_modes=ValidModes(())
+)
@@ -0,0 +1,301 @@
+import threading
+import numpy as np
+from decimation import lttb, douglas_peucker, track_coordinates
+from spatial_index import GridIndex, radius_bbox, haversine_m
+from interpolation import slerp_attitude, lerp_heading
+
+
+# Scalar columns kept per sample: (name, dtype, extractor from a TelemetryFrame)
+HISTORY_COLUMNS = (
+    ("timestamp", np.float64, lambda f: f.timestamp),
+    ("latitude", np.float64, lambda f: f.position.latitude),
+    ("longitude", np.float64, lambda f: f.position.longitude),
+    ("altitude", np.float64, lambda f: f.position.altitude),
+    ("vx", np.float64, lambda f: f.velocity.vx),
+    ("vy", np.float64, lambda f: f.velocity.vy),
+    ("vz", np.float64, lambda f: f.velocity.vz),
+    ("roll", np.float64, lambda f: f.attitude.roll),
+    ("pitch", np.float64, lambda f: f.attitude.pitch),
+    ("yaw", np.float64, lambda f: f.attitude.yaw),
+    ("voltage", np.float64, lambda f: f.battery.voltage),
+    ("current", np.float64, lambda f: f.battery.current),
+    ("level", np.int32, lambda f: f.battery.level),
+    ("heading", np.float64, lambda f: f.navigation.heading),
+    ("groundspeed", np.float64, lambda f: f.navigation.groundspeed),
+    ("airspeed", np.float64, lambda f: f.navigation.airspeed),
+    ("fix_type", np.int32, lambda f: f.navigation.fix_type),
+    ("satellites_visible", np.int32, lambda f: f.navigation.satellites_visible),
+    ("armed", np.int32, lambda f: f.state.armed)
+)
+
+COLUMN_NAMES = tuple(name for name, _, _ in HISTORY_COLUMNS)
+
+ATTITUDE_COLUMNS = ("roll", "pitch", "yaw")
+
+# Upper bounds on query results: grid points of a resample, and max_points
+MAX_RESAMPLE_POINTS = 100_000
+MAX_QUERY_POINTS = 10_000
+
+# Columns each decimation method selects samples by
+DECIMATION_COLUMNS = {
+    "lttb": ("timestamp", "altitude"),
+    "douglas_peucker": ("latitude", "longitude")
+}
+
+
+def resolve_decimation(decimation, fields):
+    """Decimation method to use, defaulting by the requested fields.
+
+    Track queries (all fields, or latitude and longitude among them) default to
+    Douglas-Peucker, which keeps the turns; anything else to LTTB over altitude.
+    """
+    if decimation is None:
+        if fields is None or ("latitude" in fields and "longitude" in fields):
+            return "douglas_peucker"
+        return "lttb"
+    if decimation not in DECIMATION_COLUMNS:
+        raise ValueError(f"Unknown decimation method: {decimation}")
+    return decimation
+
+
+def resample_columns(data, interval, max_samples=MAX_RESAMPLE_POINTS):
+    """Resample time-ordered columns onto a uniform grid every ``interval`` seconds.
+
+    Float columns are linearly interpolated, integer columns hold the last
+    sample at or before each grid point. The interval is widened as needed so
+    the grid has at most ``max_samples`` points.
+    """
+    timestamps = data["timestamp"]
+    interval = max(interval, (timestamps[-1] - timestamps[0]) / (max_samples - 1))
+    grid = np.arange(timestamps[0], timestamps[-1] + interval * 0.5, interval)
+    previous = np.clip(np.searchsorted(timestamps, grid, side="right") - 1, 0, len(timestamps) - 1)
+    resampled = {"timestamp": grid}
+    for name, column in data.items():
+        if name == "timestamp":
+            continue
+        if np.issubdtype(column.dtype, np.floating):
+            resampled[name] = np.interp(grid, timestamps, column)
+        else:
+            resampled[name] = column[previous]
+    return resampled
+
+
+def decimate_columns(data, max_points, decimation):
+    """Keep at most ``max_points`` rows, chosen by the given decimation method"""
+    if decimation == "douglas_peucker":
+        x, y = track_coordinates(data["latitude"], data["longitude"])
+        keep = douglas_peucker(x, y, max_points=max_points)
+    elif decimation == "lttb":
+        keep = lttb(data["timestamp"], data["altitude"], max_points)
+    else:
+        raise ValueError(f"Unknown decimation method: {decimation}")
+    return {name: column[keep] for name, column in data.items()}
+
+
+class TelemetryHistory:
+    """Columnar in-memory time series of scalar telemetry fields.
+
+    Each field is a preallocated NumPy column that doubles in size as needed up
+    to ``max_samples``; past that the oldest quarter is dropped in one move.
+    Range queries are a binary search plus a slice of every requested column.
+    Positions are also kept in a GridIndex so area queries only visit the
+    samples in nearby cells.
+    """
+
+    def __init__(self, initial_capacity=4096, max_samples=1_000_000, cell_size=0.001):
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self._capacity = min(initial_capacity, max_samples)
+        self._size = 0
+        self.columns = {
+            name: np.zeros(self._capacity, dtype=dtype)
+            for name, dtype, _ in HISTORY_COLUMNS
+        }
+        self.dropped = 0
+        # Grid entries are absolute sample ids; row = id - _first_id
+        self.spatial = GridIndex(cell_size)
+        self._first_id = 0
+
+    def __len__(self):
+        return self._size
+
+    def _make_room(self):
+        if self._capacity < self.max_samples:
+            new_capacity = min(self._capacity * 2, self.max_samples)
+            for name, column in self.columns.items():
+                grown = np.zeros(new_capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                self.columns[name] = grown
+            self._capacity = new_capacity
+        else:
+            drop = max(1, self._size // 4)
+            for column in self.columns.values():
+                column[:self._size - drop] = column[drop:self._size]
+            self._size -= drop
+            self.dropped += drop
+            self._first_id += drop
+            self.spatial.prune(self._first_id)
+
+    def append(self, frame):
+        """Append one TelemetryFrame as a row"""
+        with self.lock:
+            if self._size == self._capacity:
+                self._make_room()
+            i = self._size
+            if i and frame.timestamp < self.columns["timestamp"][i - 1]:
+                # Rows must stay time-ordered for searchsorted
+                return
+            columns = self.columns
+            for name, _, extract in HISTORY_COLUMNS:
+                columns[name][i] = extract(frame)
+            self.spatial.insert(self._first_id + i, columns["latitude"][i], columns["longitude"][i])
+            self._size = i + 1
+
+    def _slice_bounds(self, start, end):
+        timestamps = self.columns["timestamp"][:self._size]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = self._size if end is None else int(np.searchsorted(timestamps, end, side="right"))
+        return lo, hi
+
+    def _area_rows(self, lo, hi, bbox=None, near=None):
+        """Sorted rows in [lo, hi) inside ``bbox`` and/or within ``near``, plus their distances"""
+        if near is not None:
+            lat, lon, radius = near
+            box = radius_bbox(lat, lon, radius)
+            if bbox is not None:
+                box = (max(box[0], bbox[0]), max(box[1], bbox[1]), min(box[2], bbox[2]), min(box[3], bbox[3]))
+        else:
+            box = bbox
+        min_lat, min_lon, max_lat, max_lon = box
+
+        rows = self.spatial.candidates(min_lat, min_lon, max_lat, max_lon) - self._first_id
+        rows = np.sort(rows[(rows >= lo) & (rows < hi)])
+        lats = self.columns["latitude"][rows]
+        lons = self.columns["longitude"][rows]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        rows = rows[inside]
+        if near is None:
+            return rows, None
+        distances = haversine_m(lat, lon, lats[inside], lons[inside])
+        within = distances <= radius
+        return rows[within], distances[within]
+
+    def query(self, start=None, end=None, fields=None, interval=None, max_points=None, decimation=None,
+              bbox=None, near=None):
+        """Return columns for samples with start <= timestamp <= end.
+
+        ``fields`` limits the columns returned (timestamp is always included).
+        With ``interval`` (seconds) the range is resampled onto a uniform grid:
+        float columns are linearly interpolated, integer columns hold the last
+        sample at or before each grid point. With ``max_points`` the result is
+        then decimated to at most that many samples, by Douglas-Peucker over
+        the lat/lon track ("douglas_peucker") or by LTTB over altitude
+        ("lttb"); by default the track method when latitude and longitude are
+        requested, see resolve_decimation. Arrays are copies, safe to keep.
+
+        ``bbox`` (min_lat, min_lon, max_lat, max_lon) and ``near``
+        (lat, lon, radius in meters) keep only samples in that area, found via
+        the grid index; ``near`` also adds a "distance" column in meters.
+        Area results are not contiguous in time, so ``interval`` is ignored
+        for them.
+        """
+        decimation = resolve_decimation(decimation, fields)
+        names = [name for name in (fields or COLUMN_NAMES) if name in self.columns]
+        if "timestamp" not in names:
+            names.insert(0, "timestamp")
+        needed = list(names)
+        if max_points:
+            needed += [name for name in DECIMATION_COLUMNS[decimation] if name not in needed]
+
+        area = bbox is not None or near is not None
+
+        with self.lock:
+            lo, hi = self._slice_bounds(start, end)
+            if area:
+                rows, distances = self._area_rows(lo, hi, bbox, near)
+                data = {name: self.columns[name][rows] for name in needed}
+            else:
+                data = {name: self.columns[name][lo:hi].copy() for name in needed}
+
+        if near is not None:
+            data["distance"] = distances
+            names.append("distance")
+        if not area and interval and interval > 0 and len(data["timestamp"]) > 1:
+            data = resample_columns(data, interval)
+        if max_points and len(data["timestamp"]) > max_points:
+            data = decimate_columns(data, int(max_points), decimation)
+        return {name: data[name] for name in names}
+
+    def telemetry_at(self, timestamp, max_gap=5.0):
+        """Vehicle state at ``timestamp``, interpolated between the neighbouring samples.
+
+        Float columns are interpolated linearly, attitude by quaternion slerp and
+        heading along the shorter turn; integer columns hold the earlier sample.
+        Across gaps longer than ``max_gap`` seconds the nearer sample is held.
+        Returns a {column: value} dict, or None outside the recorded range.
+        """
+        with self.lock:
+            size = self._size
+            if not size:
+                return None
+            timestamps = self.columns["timestamp"][:size]
+            after = int(np.searchsorted(timestamps, timestamp, side="left"))
+            if after == size or (after == 0 and timestamps[0] > timestamp):
+                return None
+            if timestamps[after] == timestamp:
+                before = after
+            else:
+                before = after - 1
+            row_before = {name: column[before].item() for name, column in self.columns.items()}
+            row_after = {name: column[after].item() for name, column in self.columns.items()}
+
+        span = row_after["timestamp"] - row_before["timestamp"]
+        if span == 0:
+            result = dict(row_before)
+            result.update(timestamp=timestamp, interpolated=False)
+            return result
+        fraction = (timestamp - row_before["timestamp"]) / span
+        if span > max_gap:
+            result = dict(row_before if fraction < 0.5 else row_after)
+            result.update(timestamp=timestamp, interpolated=False)
+            return result
+
+        result = {}
+        for name, dtype, _ in HISTORY_COLUMNS:
+            a, b = row_before[name], row_after[name]
+            if name in ATTITUDE_COLUMNS:
+                continue
+            if name == "heading":
+                result[name] = lerp_heading(a, b, fraction)
+            elif np.issubdtype(dtype, np.floating):
+                result[name] = a + (b - a) * fraction
+            else:
+                result[name] = a
+        roll, pitch, yaw = slerp_attitude(
+            tuple(row_before[name] for name in ATTITUDE_COLUMNS),
+            tuple(row_after[name] for name in ATTITUDE_COLUMNS),
+            fraction
+        )
+        result.update(roll=roll, pitch=pitch, yaw=yaw, timestamp=timestamp, interpolated=True)
+        return result
+
+    def query_json(self, start=None, end=None, fields=None, interval=None, max_points=None, decimation=None,
+                   bbox=None, near=None):
+        """query() with plain lists, ready for json.dumps"""
+        data = self.query(start, end, fields, interval, max_points, decimation, bbox, near)
+        return {name: column.tolist() for name, column in data.items()}
+
+    def get_stats(self):
+        """Get history statistics for monitoring"""
+        with self.lock:
+            timestamps = self.columns["timestamp"]
+            return {
+                "samples": self._size,
+                "capacity": self._capacity,
+                "max_samples": self.max_samples,
+                "dropped": self.dropped,
+                "bytes": sum(column.nbytes for column in self.columns.values()),
+                "spatial_index": self.spatial.get_stats(),
+                "oldest": float(timestamps[0]) if self._size else None,
+                "newest": float(timestamps[self._size - 1]) if self._size else None
+            }
@@ -0,0 +1,148 @@
+import time
+import threading
+import logging
+from worker_pool import vehicle_access_pool, PoolSaturatedError
+from telemetry_frame import TelemetryFrame, GroupSequencer, FALLBACK_GROUPS
+
+
+# Refresh rate per telemetry group in Hz; 0 reads the group once on connect
+DEFAULT_REFRESH_RATES = {
+    "attitude": 50,
+    "position": 10,
+    "velocity": 10,
+    "control": 5,
+    "heartbeat": 5,
+    "navigation": 2,
+    "state": 2,
+    "battery": 1,
+    "valid_modes": 0
+}
+
+
+class TelemetryScheduler:
+    """Refreshes each telemetry group at its own rate on a single background thread.
+
+    Reads are submitted to the shared vehicle access pool without blocking, so a
+    hung group only delays itself. Between reads the thread sleeps until the next
+    group is due or an in-flight read hits its deadline, and a finished read
+    wakes it early. ``snapshot()`` combines the latest value of every group and
+    never touches the vehicle.
+    """
+
+    def __init__(self, telemetry, rates=None, read_timeout=0.5):
+        self.telemetry = telemetry
+        self.rates = dict(DEFAULT_REFRESH_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.read_timeout = read_timeout
+
+        self.lock = threading.Lock()
+        self.latest = {name: FALLBACK_GROUPS[name] for name in self.rates}
+        self.updated_at = {name: None for name in self.rates}
+        self.read_counts = {name: 0 for name in self.rates}
+        self.timeout_counts = {name: 0 for name in self.rates}
+        self.sequencer = GroupSequencer()
+
+        self.running = False
+        self.thread = None
+        # Set by stop() and by every finished read
+        self._wakeup = threading.Event()
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.running = True
+            self._wakeup.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            logging.info(f"Started tiered telemetry scheduler: {self.rates}")
+
+    def stop(self):
+        self.running = False
+        self._wakeup.set()
+        if self.thread is not None and threading.current_thread() != self.thread:
+            self.thread.join(timeout=2)
+        self.thread = None
+        logging.info("Stopped tiered telemetry scheduler")
+
+    def _run(self):
+        readers = dict(self.telemetry._telemetry_methods())
+        periods = {
+            name: 1.0 / rate if rate else None
+            for name, rate in self.rates.items()
+        }
+        # Every group is read once straight away
+        next_due = {name: time.monotonic() for name in self.rates}
+        inflight = {}
+
+        while self.running:
+            now = time.monotonic()
+
+            # Harvest finished reads and give up on overdue ones
+            for name, (task, submitted_at) in list(inflight.items()):
+                if task.done.is_set():
+                    del inflight[name]
+                    if task.exception is None and task.result is not None:
+                        with self.lock:
+                            self.latest[name] = task.result
+                            self.updated_at[name] = time.time()
+                            self.read_counts[name] += 1
+                        continue
+                    logging.debug(f"Tiered read of {name} failed: {task.exception}")
+                elif now - submitted_at > self.read_timeout and vehicle_access_pool.abandon(task):
+                    del inflight[name]
+                    with self.lock:
+                        self.timeout_counts[name] += 1
+                    logging.warning(f"⚠️ Tiered read of {name} timed out after {self.read_timeout}s")
+                else:
+                    continue
+                # Connect-only groups are retried until one read succeeds
+                if next_due[name] is None:
+                    next_due[name] = now + 1.0
+
+            # Submit groups that are due and not already being read
+            for name, due in next_due.items():
+                if due is None or due > now or name in inflight:
+                    continue
+                try:
+                    inflight[name] = (vehicle_access_pool.submit(readers[name], on_done=self._wakeup.set), now)
+                except PoolSaturatedError as e:
+                    logging.debug(f"Tiered read of {name} deferred: {e}")
+                    # Retry a period later instead of spinning on a full pool
+                    next_due[name] = now + (periods[name] or 1.0)
+                    continue
+                period = periods[name]
+                next_due[name] = now + period if period else None
+
+            # Sleep until an idle group is due or an in-flight read times out;
+            # a group being read is resubmitted once its read finishes
+            wake_times = [due for name, due in next_due.items() if due is not None and name not in inflight]
+            wake_times += [submitted_at + self.read_timeout for _, submitted_at in inflight.values()]
+            delay = (min(wake_times) - time.monotonic()) if wake_times else 1.0
+            self._wakeup.wait(max(delay, 0.001))
+            self._wakeup.clear()
+
+    def snapshot_frame(self):
+        """Combine the latest value of every group into a TelemetryFrame"""
+        with self.lock:
+            # Stamped with the newest group read, so stalled reads age the frame
+            read_times = [updated for updated in self.updated_at.values() if updated]
+            frame = TelemetryFrame.from_groups(max(read_times) if read_times else time.time(), self.latest)
+        return self.sequencer.stamp(frame)
+
+    def snapshot(self, since=None):
+        return self.snapshot_frame().to_dict(since=since)
+
+    def get_stats(self):
+        """Get scheduler statistics for monitoring"""
+        current_time = time.time()
+        with self.lock:
+            return {
+                "running": self.running,
+                "rates": dict(self.rates),
+                "read_counts": dict(self.read_counts),
+                "timeout_counts": dict(self.timeout_counts),
+                "group_ages": {
+                    name: current_time - updated if updated else None
+                    for name, updated in self.updated_at.items()
+                }
+            }
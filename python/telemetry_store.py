@@ -0,0 +1,244 @@
+import time
+import threading
+import logging
+from telemetary_data import safe_vehicle_access
+from telemetry_frame import (
+    TelemetryFrame, GroupSequencer, FALLBACK_GROUPS, Position, Velocity, Attitude, Battery,
+    HomeLocation, EkfStatus, ValidModes
+)
+
+
+class TelemetryStore:
+    """Event-driven telemetry frame fed by dronekit attribute and message listeners.
+
+    Listeners are registered once per connection and swap fresh group records
+    into the current frame, so ``snapshot_frame()`` never touches the vehicle
+    object and never copies.
+    """
+
+    def __init__(self, vehicle):
+        self.vehicle = vehicle
+        self.lock = threading.Lock()
+        self.groups = dict(FALLBACK_GROUPS)
+        self.last_update = None
+        self.update_count = 0
+        self.attached = False
+        self._last_heartbeat_at = None
+        self.sequencer = GroupSequencer()
+
+        self._attribute_handlers = {
+            "location.global_frame": self._on_location,
+            "velocity": self._on_velocity,
+            "attitude": self._on_attitude,
+            "battery": self._on_battery,
+            "armed": self._on_armed,
+            "mode": self._on_mode,
+            "system_status": self._on_system_status,
+            "channels": self._on_channels,
+            "gps_0": self._on_gps,
+            "heading": self._on_navigation_scalar,
+            "groundspeed": self._on_navigation_scalar,
+            "airspeed": self._on_navigation_scalar,
+            "home_location": self._on_home_location,
+            "ekf_ok": self._on_ekf
+        }
+
+    def attach(self, telemetry=None):
+        """Register listeners on the vehicle, seeding the frame from one full poll"""
+        if self.attached:
+            return
+
+        if telemetry is not None:
+            seed = telemetry.snapshot_frame()
+            with self.lock:
+                for name in self.groups:
+                    self.groups[name] = seed.group(name)
+                self._last_heartbeat_at = time.monotonic()
+                self.last_update = time.time()
+        else:
+            self.refresh_valid_modes()
+
+        for name, handler in self._attribute_handlers.items():
+            self.vehicle.add_attribute_listener(name, handler)
+        self.vehicle.add_message_listener("HEARTBEAT", self._on_heartbeat)
+        self.attached = True
+        logging.info(f"📡 Telemetry store attached ({len(self._attribute_handlers)} attribute listeners)")
+
+    def detach(self):
+        """Remove all listeners registered by attach()"""
+        if not self.attached:
+            return
+
+        for name, handler in self._attribute_handlers.items():
+            try:
+                self.vehicle.remove_attribute_listener(name, handler)
+            except Exception as e:
+                logging.debug(f"Error removing listener for {name}: {e}")
+        try:
+            self.vehicle.remove_message_listener("HEARTBEAT", self._on_heartbeat)
+        except Exception as e:
+            logging.debug(f"Error removing HEARTBEAT listener: {e}")
+        self.attached = False
+        logging.info("📡 Telemetry store detached")
+
+    def refresh_valid_modes(self):
+        """Read the mode mapping once (it only changes with the vehicle type)"""
+        def get_modes():
+            return ValidModes(tuple(self.vehicle.mode_mapping().keys()))
+
+        modes = safe_vehicle_access(get_modes, timeout_seconds=2, default_value=None)
+        if modes:
+            with self.lock:
+                self.groups["valid_modes"] = modes
+
+    def _touch(self):
+        self.last_update = time.time()
+        self.update_count += 1
+
+    @staticmethod
+    def _is_armable(vehicle):
+        # dronekit derives is_armable from mode, GPS fix and EKF state without ever
+        # notifying listeners, so it is re-read whenever one of those changes
+        armable = vehicle.is_armable
+        return armable if armable is not None else False
+
+    # Listener callbacks - invoked on dronekit's message thread, keep them short
+
+    def _on_location(self, vehicle, name, loc):
+        position = Position(
+            loc.lat if loc.lat is not None else 0.0,
+            loc.lon if loc.lon is not None else 0.0,
+            loc.alt if loc.alt is not None else 0.0
+        )
+        with self.lock:
+            self.groups["position"] = position
+            self._touch()
+
+    def _on_velocity(self, vehicle, name, value):
+        vx, vy, vz = value
+        velocity = Velocity(
+            vx if vx is not None else 0.0,
+            vy if vy is not None else 0.0,
+            vz if vz is not None else 0.0
+        )
+        with self.lock:
+            self.groups["velocity"] = velocity
+            self._touch()
+
+    def _on_attitude(self, vehicle, name, att):
+        attitude = Attitude(
+            att.roll if att.roll is not None else 0.0,
+            att.pitch if att.pitch is not None else 0.0,
+            att.yaw if att.yaw is not None else 0.0
+        )
+        with self.lock:
+            self.groups["attitude"] = attitude
+            self._touch()
+
+    def _on_battery(self, vehicle, name, batt):
+        battery = Battery(
+            batt.voltage if batt.voltage is not None else 0.0,
+            batt.current if batt.current is not None else 0.0,
+            batt.level if batt.level is not None else -1
+        )
+        with self.lock:
+            self.groups["battery"] = battery
+            self._touch()
+
+    def _on_armed(self, vehicle, name, armed):
+        armed = armed if armed is not None else False
+        with self.lock:
+            groups = self.groups
+            groups["state"] = groups["state"]._replace(armed=armed)
+            groups["control"] = groups["control"]._replace(armed=armed)
+            groups["heartbeat"] = groups["heartbeat"]._replace(armed=armed)
+            self._touch()
+
+    def _on_mode(self, vehicle, name, mode):
+        mode_name = mode.name if mode and mode.name else "UNKNOWN"
+        armable = self._is_armable(vehicle)
+        with self.lock:
+            groups = self.groups
+            groups["state"] = groups["state"]._replace(mode=mode_name)
+            groups["control"] = groups["control"]._replace(mode=mode_name)
+            groups["navigation"] = groups["navigation"]._replace(is_armable=armable)
+            self._touch()
+
+    def _on_system_status(self, vehicle, name, status):
+        state = status.state if status and status.state else "UNKNOWN"
+        with self.lock:
+            groups = self.groups
+            groups["state"] = groups["state"]._replace(system_status=state)
+            groups["control"] = groups["control"]._replace(system_status=state)
+            self._touch()
+
+    def _on_channels(self, vehicle, name, channels):
+        channels = dict(channels) if channels else {}
+        with self.lock:
+            self.groups["control"] = self.groups["control"]._replace(channels=channels)
+            self._touch()
+
+    def _on_gps(self, vehicle, name, gps):
+        fix_type = gps.fix_type if gps and gps.fix_type is not None else 0
+        satellites = gps.satellites_visible if gps and gps.satellites_visible is not None else 0
+        armable = self._is_armable(vehicle)
+        with self.lock:
+            self.groups["navigation"] = self.groups["navigation"]._replace(
+                fix_type=fix_type, satellites_visible=satellites, is_armable=armable
+            )
+            self._touch()
+
+    def _on_navigation_scalar(self, vehicle, name, value):
+        with self.lock:
+            self.groups["navigation"] = self.groups["navigation"]._replace(
+                **{name: value if value is not None else 0}
+            )
+            self._touch()
+
+    def _on_home_location(self, vehicle, name, home):
+        home_location = HomeLocation(home.lat, home.lon, home.alt) if home else HomeLocation()
+        with self.lock:
+            self.groups["navigation"] = self.groups["navigation"]._replace(home_location=home_location)
+            self._touch()
+
+    def _on_ekf(self, vehicle, name, ekf_ok):
+        ekf_status = EkfStatus(
+            ekf_ok if ekf_ok is not None else False,
+            getattr(vehicle, '_ekf_constposmode', False),
+            getattr(vehicle, '_ekf_poshorizabs', False),
+            getattr(vehicle, '_ekf_predposhorizabs', False)
+        )
+        armable = self._is_armable(vehicle)
+        with self.lock:
+            self.groups["navigation"] = self.groups["navigation"]._replace(
+                ekf_ok=ekf_status.ekf_ok, ekf_detailed=ekf_status, is_armable=armable
+            )
+            self._touch()
+
+    def _on_heartbeat(self, vehicle, name, message):
+        with self.lock:
+            self._last_heartbeat_at = time.monotonic()
+            self._touch()
+
+    def snapshot_frame(self):
+        """Return the latest TelemetryFrame without touching the vehicle"""
+        with self.lock:
+            # Stamped with the time of the last update, so an unchanged store ages
+            frame = TelemetryFrame.from_groups(self.last_update or time.time(), self.groups)
+            if self._last_heartbeat_at is not None:
+                frame.heartbeat = frame.heartbeat._replace(
+                    last_heartbeat=time.monotonic() - self._last_heartbeat_at
+                )
+        return self.sequencer.stamp(frame)
+
+    def snapshot(self, since=None):
+        return self.snapshot_frame().to_dict(since=since)
+
+    def get_stats(self):
+        """Get store statistics for monitoring"""
+        with self.lock:
+            return {
+                "attached": self.attached,
+                "update_count": self.update_count,
+                "last_update_age": time.time() - self.last_update if self.last_update else None
+            }
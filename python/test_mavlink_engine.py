@@ -0,0 +1,90 @@
+import time
+import socket
+from mavlink_engine import MavlinkEngine, MavlinkUdpStandIn
+from pymavlink.dialects.v20 import ardupilotmega as mavlink
+
+
+def free_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def wait_for(engine, predicate, timeout=5.0):
+    """Latest frame once ``predicate(frame)`` holds, failing after ``timeout`` seconds"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        frame = engine.snapshot_frame()
+        if predicate(frame):
+            return frame
+        time.sleep(0.05)
+    raise AssertionError(f"Timed out waiting for frame, last: {engine.snapshot_frame().to_dict()}")
+
+
+def run_engine():
+    port = free_udp_port()
+    engine = MavlinkEngine(f"udpin:127.0.0.1:{port}")
+    engine.start()
+    stand_in = MavlinkUdpStandIn(("127.0.0.1", port), rate_hz=50)
+    stand_in.start()
+    return engine, stand_in
+
+
+def test_decodes_stream_and_skips_unused_messages():
+    engine, stand_in = run_engine()
+    try:
+        frame = wait_for(engine, lambda f: f.position.latitude != 0.0)
+        assert abs(frame.position.latitude - 28.6139) < 0.01
+        assert frame.state.armed
+        assert frame.state.mode == "GUIDED"
+        assert frame.navigation.satellites_visible == 12
+        assert frame.battery.level == 87
+        assert engine.packets_skipped > 0
+        assert engine.bad_packets == 0
+    finally:
+        stand_in.stop()
+        engine.stop()
+
+
+def test_home_ekf_and_armable_follow_the_stream():
+    engine, stand_in = run_engine()
+    try:
+        frame = wait_for(engine, lambda f: f.navigation.is_armable)
+        assert frame.navigation.ekf_ok
+        assert frame.navigation.ekf_detailed.ekf_predposhorizabs
+        assert abs(frame.navigation.home_location.lat - 28.6139) < 1e-6
+        assert "GUIDED" in frame.valid_modes.modes
+
+        # Home reset
+        stand_in.home = (47.3977, 8.5456, 488.0)
+        wait_for(engine, lambda f: abs(f.navigation.home_location.lat - 47.3977) < 1e-6)
+
+        # EKF failure
+        stand_in.ekf_flags = mavlink.EKF_ATTITUDE
+        frame = wait_for(engine, lambda f: not f.navigation.ekf_ok)
+        assert not frame.navigation.is_armable
+
+        # GPS loss with a healthy EKF still leaves the vehicle unarmable
+        stand_in.ekf_flags = mavlink.EKF_ATTITUDE | mavlink.EKF_POS_HORIZ_ABS | mavlink.EKF_PRED_POS_HORIZ_ABS
+        stand_in.fix_type = 1
+        frame = wait_for(engine, lambda f: f.navigation.fix_type == 1 and f.navigation.ekf_ok)
+        assert not frame.navigation.is_armable
+
+        stand_in.fix_type = 3
+        wait_for(engine, lambda f: f.navigation.is_armable)
+    finally:
+        stand_in.stop()
+        engine.stop()
+
+
+def test_gcs_heartbeat_is_ignored():
+    engine = MavlinkEngine("udpin:127.0.0.1:0")
+    mav = mavlink.MAVLink(None, srcSystem=255, srcComponent=190)
+    gcs = mav.heartbeat_encode(
+        mavlink.MAV_TYPE_GCS, mavlink.MAV_AUTOPILOT_INVALID, 0, 0, mavlink.MAV_STATE_ACTIVE
+    ).pack(mav)
+    engine.feed(gcs)
+    assert engine.packets_decoded == 1
+    assert engine.snapshot_frame().state.mode == "UNKNOWN"
@@ -0,0 +1,211 @@
+import json
+import math
+import struct
+import time
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional; "struct" needs only the stdlib
+    msgpack = None
+
+WIRE_VERSION = 1
+
+# WebSocket subprotocol -> wire format of the telemetry broadcast
+SUBPROTOCOLS = {
+    "drone-telemetry.json": "json",
+    "drone-telemetry.struct": "struct",
+    "drone-telemetry.msgpack": "msgpack"
+}
+
+NAN = float("nan")
+
+STRUCT_TYPES = {
+    "B": "uint8", "b": "int8", "H": "uint16", "Q": "uint64",
+    "f": "float32", "d": "float64", "16s": "string", "24s": "string"
+}
+
+# Fixed little-endian frame layout: (dotted path in the JSON snapshot, struct code).
+# Floats that are null in JSON are sent as NaN, strings are NUL-padded ASCII.
+FRAME_FIELDS = (
+    ("version", "B"),
+    ("timestamp", "d"),
+    ("seq", "Q"),
+    ("position.latitude", "d"),
+    ("position.longitude", "d"),
+    ("position.altitude", "f"),
+    ("velocity.vx", "f"),
+    ("velocity.vy", "f"),
+    ("velocity.vz", "f"),
+    ("attitude.roll", "f"),
+    ("attitude.pitch", "f"),
+    ("attitude.yaw", "f"),
+    ("battery.voltage", "f"),
+    ("battery.current", "f"),
+    ("battery.level", "b"),
+    ("navigation.heading", "f"),
+    ("navigation.groundspeed", "f"),
+    ("navigation.airspeed", "f"),
+    ("navigation.fix_type", "B"),
+    ("navigation.satellites_visible", "B"),
+    ("navigation.home_location.lat", "d"),
+    ("navigation.home_location.lon", "d"),
+    ("navigation.home_location.alt", "f"),
+    ("heartbeat.last_heartbeat", "d"),
+    ("flags", "H"),
+    ("connection_status", "24s"),
+    ("state.mode", "16s"),
+    ("state.system_status", "16s"),
+) + tuple((f"control.channels.{i}", "H") for i in range(1, 9))
+
+# Booleans packed into the "flags" field, by bit
+FRAME_FLAGS = (
+    "state.armed",
+    "control.armed",
+    "heartbeat.armed",
+    "navigation.is_armable",
+    "navigation.ekf_ok",
+    "navigation.ekf_detailed.ekf_constposmode",
+    "navigation.ekf_detailed.ekf_poshorizabs",
+    "navigation.ekf_detailed.ekf_predposhorizabs"
+)
+
+FRAME = struct.Struct("<" + "".join(code for _, code in FRAME_FIELDS))
+
+
+def _number(value):
+    return NAN if value is None else value
+
+
+def _text(value):
+    return str(value).encode("ascii", "replace")
+
+
+def pack_frame(frame):
+    """Pack a TelemetryFrame into the fixed FRAME layout, without building a dict"""
+    nav = frame.navigation
+    home = nav.home_location
+    ekf = nav.ekf_detailed
+    battery = frame.battery
+    channels = frame.control.channels
+    flags = 0
+    for bit, value in enumerate((
+        frame.state.armed, frame.control.armed, frame.heartbeat.armed,
+        nav.is_armable, nav.ekf_ok,
+        ekf.ekf_constposmode, ekf.ekf_poshorizabs, ekf.ekf_predposhorizabs
+    )):
+        if value:
+            flags |= 1 << bit
+    level = battery.level
+    return FRAME.pack(
+        WIRE_VERSION, frame.timestamp, frame.seq,
+        _number(frame.position.latitude), _number(frame.position.longitude), _number(frame.position.altitude),
+        _number(frame.velocity.vx), _number(frame.velocity.vy), _number(frame.velocity.vz),
+        _number(frame.attitude.roll), _number(frame.attitude.pitch), _number(frame.attitude.yaw),
+        _number(battery.voltage), _number(battery.current),
+        max(-1, min(int(level), 127)) if level is not None else -1,
+        _number(nav.heading), _number(nav.groundspeed), _number(nav.airspeed),
+        (nav.fix_type or 0) & 0xFF, (nav.satellites_visible or 0) & 0xFF,
+        _number(home.lat), _number(home.lon), _number(home.alt),
+        _number(frame.heartbeat.last_heartbeat),
+        flags,
+        _text(frame.connection_status), _text(frame.state.mode), _text(frame.state.system_status),
+        *(int(channels.get(str(i)) or 0) & 0xFFFF for i in range(1, 9))
+    )
+
+
+def unpack_frame(buffer):
+    """Decode a packed frame back into the nested snapshot layout (for tests and tools)"""
+    data = {}
+    for (path, code), value in zip(FRAME_FIELDS, FRAME.unpack(buffer)):
+        if code.endswith("s"):
+            value = value.rstrip(b"\0").decode("ascii")
+        elif isinstance(value, float) and math.isnan(value):
+            value = None
+        _set_path(data, path, value)
+    flags = data.pop("flags")
+    for bit, path in enumerate(FRAME_FLAGS):
+        _set_path(data, path, bool(flags & (1 << bit)))
+    data.pop("version")
+    return data
+
+
+def _set_path(data, path, value):
+    *parents, leaf = path.split(".")
+    for key in parents:
+        data = data.setdefault(key, {})
+    data[leaf] = value
+
+
+def available_formats():
+    return ("json", "struct", "msgpack") if msgpack is not None else ("json", "struct")
+
+
+def schema_descriptor(fmt):
+    """Message telling a client how to decode the telemetry frames of ``fmt``"""
+    descriptor = {"type": "schema", "format": fmt, "version": WIRE_VERSION}
+    if fmt == "struct":
+        fields = []
+        offset = 0
+        for path, code in FRAME_FIELDS:
+            size = struct.calcsize("<" + code)
+            fields.append({"name": path, "type": STRUCT_TYPES[code], "offset": offset, "size": size})
+            offset += size
+        descriptor.update({
+            "byte_order": "little",
+            "size": FRAME.size,
+            "fields": fields,
+            "flags": {path: 1 << bit for bit, path in enumerate(FRAME_FLAGS)},
+            "nan_is_null": True,
+            # Not in the binary frame; request them with get_telemetry
+            "omitted": ["valid_modes", "stale_groups", "control.channels above 8"]
+        })
+    elif fmt == "msgpack":
+        descriptor["layout"] = "same nested map as the JSON snapshot"
+    return descriptor
+
+
+class WireEncoder:
+    """Encodes each broadcast tick once per wire format in use, with timing.
+
+    ``begin`` starts a tick; ``message`` encodes lazily, so a format costs
+    nothing when no client asked for it.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.telemetry = None
+        self._encoded = {}
+        self.stats = {fmt: {"messages": 0, "bytes": 0, "encode_seconds": 0.0} for fmt in SUBPROTOCOLS.values()}
+
+    def begin(self, frame, telemetry):
+        self.frame = frame
+        self.telemetry = telemetry
+        self._encoded = {}
+
+    def message(self, fmt):
+        message = self._encoded.get(fmt)
+        if message is None:
+            started = time.perf_counter()
+            if fmt == "struct":
+                message = pack_frame(self.frame)
+            elif fmt == "msgpack":
+                message = msgpack.packb(self.telemetry)
+            else:
+                message = json.dumps(self.telemetry)
+            stats = self.stats[fmt]
+            stats["encode_seconds"] += time.perf_counter() - started
+            stats["messages"] += 1
+            stats["bytes"] += len(message)
+            self._encoded[fmt] = message
+        return message
+
+    def get_stats(self):
+        """Per-format encode counts, average payload bytes and encode time"""
+        return {
+            fmt: {
+                "encoded": stats["messages"],
+                "avg_bytes": stats["bytes"] / stats["messages"] if stats["messages"] else None,
+                "avg_encode_us": stats["encode_seconds"] / stats["messages"] * 1e6 if stats["messages"] else None
+            }
+            for fmt, stats in self.stats.items()
+        }
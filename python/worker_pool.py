@@ -0,0 +1,177 @@
+import threading
+import logging
+from collections import deque
+from typing import Callable, Any, Optional
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the pool cannot accept more work"""
+    pass
+
+
+class _Task:
+    __slots__ = ("func", "on_done", "done", "result", "exception", "started", "abandoned")
+
+    def __init__(self, func: Callable, on_done: Optional[Callable[[], None]] = None):
+        self.func = func
+        self.on_done = on_done
+        self.done = threading.Event()
+        self.result = None
+        self.exception: Optional[BaseException] = None
+        self.started = False
+        self.abandoned = False
+
+
+class BoundedWorkerPool:
+    """Shared worker pool with a hard thread cap and per-call deadlines.
+
+    Idle workers are reused and retire after ``idle_timeout``. A call that misses
+    its deadline is abandoned: if it had not started it is skipped, otherwise its
+    worker is counted as stuck until the blocking read finally returns.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_pending: int = 32,
+        idle_timeout: float = 30.0,
+        name: str = "worker_pool"
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.idle_timeout = idle_timeout
+        self.name = name
+
+        self._cond = threading.Condition(threading.Lock())
+        self._tasks: deque = deque()
+        self._workers = 0
+        self._idle_workers = 0
+        self._stuck_workers = 0
+
+        # Accounting
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.recovered = 0
+        self.threads_started = 0
+
+        self.logger = logging.getLogger(f"worker_pool.{name}")
+
+    def submit(self, func: Callable, on_done: Optional[Callable[[], None]] = None) -> _Task:
+        """Queue ``func`` on a pooled worker and return its task handle.
+
+        ``on_done`` is called on the worker thread once the task is done.
+        """
+        task = _Task(func, on_done)
+        with self._cond:
+            if self._stuck_workers >= self.max_workers:
+                self.rejected += 1
+                raise PoolSaturatedError(f"{self.name}: all {self.max_workers} workers are stuck")
+            if len(self._tasks) >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturatedError(f"{self.name}: {len(self._tasks)} calls already pending")
+
+            self._tasks.append(task)
+            self.submitted += 1
+
+            if self._idle_workers >= len(self._tasks):
+                self._cond.notify()
+            elif self._workers < self.max_workers:
+                self._workers += 1
+                self.threads_started += 1
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"{self.name}-{self.threads_started}",
+                    daemon=True
+                )
+                thread.start()
+        return task
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._idle_workers += 1
+                while not self._tasks:
+                    if not self._cond.wait(timeout=self.idle_timeout) and not self._tasks:
+                        # Idle for too long - retire this worker
+                        self._idle_workers -= 1
+                        self._workers -= 1
+                        return
+                self._idle_workers -= 1
+                task = self._tasks.popleft()
+                if task.abandoned:
+                    # Caller already gave up before the call started
+                    continue
+                task.started = True
+
+            try:
+                task.result = task.func()
+            except Exception as e:
+                task.exception = e
+
+            with self._cond:
+                if task.abandoned:
+                    self._stuck_workers -= 1
+                    self.recovered += 1
+                    self.logger.info(f"{self.name}: stuck worker returned after its caller gave up")
+                elif task.exception is not None:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                task.done.set()
+            if task.on_done is not None:
+                try:
+                    task.on_done()
+                except Exception as e:
+                    self.logger.error(f"{self.name}: completion callback failed: {e}")
+
+    def abandon(self, task: _Task) -> bool:
+        """Give up on ``task``; returns False if it had already finished"""
+        with self._cond:
+            if task.done.is_set():
+                return False
+            task.abandoned = True
+            self.timed_out += 1
+            if task.started:
+                self._stuck_workers += 1
+            return True
+
+    def run(self, func: Callable, timeout: float, default: Any = None) -> Any:
+        """Run ``func`` on a pooled worker, returning ``default`` if it misses ``timeout``.
+
+        Exceptions raised by ``func`` are re-raised in the caller.
+        """
+        task = self.submit(func)
+
+        if not task.done.wait(timeout) and self.abandon(task):
+            return default
+
+        if task.exception is not None:
+            raise task.exception
+        return task.result
+
+    def get_stats(self) -> dict:
+        """Get current pool accounting"""
+        with self._cond:
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "workers": self._workers,
+                "idle_workers": self._idle_workers,
+                "busy_workers": self._workers - self._idle_workers - self._stuck_workers,
+                "stuck_workers": self._stuck_workers,
+                "pending": len(self._tasks),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "rejected": self.rejected,
+                "recovered": self.recovered,
+                "threads_started": self.threads_started
+            }
+
+
+# Sized so a concurrent snapshot can read all nine groups at once
+vehicle_access_pool = BoundedWorkerPool(max_workers=10, name="vehicle_access")
@@ -0,0 +1,204 @@
+import sys
+import json
+import time
+import zlib
+import argparse
+from websockets.frames import CONT, CTRL_OPCODES
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from replay import open_recording
+from telemetry_delta import merge_diff
+from wire_format import pack_frame, msgpack
+
+
+class CompressionStats:
+    """Bytes in/out and CPU time of permessage-deflate across all connections"""
+
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.skipped_bytes = 0
+        self.seconds = 0.0
+
+    def get_stats(self):
+        saved = self.bytes_in - self.bytes_out
+        return {
+            "messages_compressed": self.compressed,
+            "messages_below_threshold": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": saved,
+            "skipped_bytes": self.skipped_bytes,
+            "ratio": self.bytes_in / self.bytes_out if self.bytes_out else None,
+            "cpu_seconds": self.seconds,
+            "avg_compress_us": self.seconds / self.compressed * 1e6 if self.compressed else None,
+            "cpu_us_per_kb_saved": self.seconds * 1e6 / (saved / 1024) if saved > 0 else None
+        }
+
+
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate that sends messages under ``min_size`` bytes uncompressed.
+
+    RFC 7692 lets each message choose: an uncompressed one just leaves RSV1
+    clear and never touches the shared LZ77 window, so the peer stays in sync.
+    """
+
+    def __init__(self, *args, min_size=0, stats=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+        self.stats = stats
+        self._passthrough = False
+
+    def encode(self, frame):
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        if frame.opcode is not CONT:
+            self._passthrough = frame.fin and len(frame.data) < self.min_size
+        if self._passthrough:
+            if self.stats is not None:
+                self.stats.skipped += 1
+                self.stats.skipped_bytes += len(frame.data)
+            return frame
+        if self.stats is None:
+            return super().encode(frame)
+        started = time.perf_counter()
+        encoded = super().encode(frame)
+        self.stats.seconds += time.perf_counter() - started
+        self.stats.bytes_in += len(frame.data)
+        self.stats.bytes_out += len(encoded.data)
+        if frame.fin:
+            self.stats.compressed += 1
+        return encoded
+
+
+class TunedDeflateFactory(ServerPerMessageDeflateFactory):
+    """Server permessage-deflate negotiation producing ThresholdPerMessageDeflate"""
+
+    def __init__(self, min_size=0, stats=None, **kwargs):
+        super().__init__(**kwargs)
+        self.min_size = min_size
+        self.stats = stats
+
+    def process_request_params(self, params, accepted_extensions):
+        response, extension = super().process_request_params(params, accepted_extensions)
+        tuned = ThresholdPerMessageDeflate(
+            extension.remote_no_context_takeover,
+            extension.local_no_context_takeover,
+            extension.remote_max_window_bits,
+            extension.local_max_window_bits,
+            extension.compress_settings,
+            min_size=self.min_size,
+            stats=self.stats
+        )
+        return response, tuned
+
+
+def deflate_extensions(window_bits=12, mem_level=5, min_size=0, stats=None):
+    """Extension list for websockets.serve (used with compression=None).
+
+    The defaults match websockets' own permessage-deflate settings.
+    """
+    return [
+        TunedDeflateFactory(
+            min_size=min_size,
+            stats=stats,
+            server_max_window_bits=window_bits,
+            client_max_window_bits=window_bits,
+            compress_settings={"memLevel": mem_level}
+        )
+    ]
+
+
+def benchmark(messages, window_bits=(9, 12, 15), mem_levels=(1, 5, 9), min_sizes=(0,), context_takeover=(True, False)):
+    """Compress a message sequence as one permessage-deflate connection would, per setting.
+
+    With context takeover the LZ77 window carries over between messages, so
+    each frame is compressed against the previous ones as a shared dictionary.
+    Returns one result dict per combination, smallest output first.
+    """
+    messages = [m.encode() if isinstance(m, str) else m for m in messages]
+    total = sum(len(m) for m in messages)
+    results = []
+    for bits in window_bits:
+        for mem_level in mem_levels:
+            for min_size in min_sizes:
+                for takeover in context_takeover:
+                    compressor = zlib.compressobj(wbits=-bits, memLevel=mem_level)
+                    out = 0
+                    started = time.perf_counter()
+                    for message in messages:
+                        if len(message) < min_size:
+                            out += len(message)
+                            continue
+                        if not takeover:
+                            compressor = zlib.compressobj(wbits=-bits, memLevel=mem_level)
+                        # Sync flush tail (00 00 ff ff) is stripped on the wire
+                        out += len(compressor.compress(message) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+                    seconds = time.perf_counter() - started
+                    saved = total - out
+                    results.append({
+                        "window_bits": bits,
+                        "mem_level": mem_level,
+                        "min_size": min_size,
+                        "context_takeover": takeover,
+                        "bytes_in": total,
+                        "bytes_out": out,
+                        "ratio": total / out if out else None,
+                        "us_per_message": seconds / len(messages) * 1e6 if messages else None,
+                        "cpu_us_per_kb_saved": seconds * 1e6 / (saved / 1024) if saved > 0 else None
+                    })
+    results.sort(key=lambda r: r["bytes_out"])
+    return results
+
+
+def recording_messages(path, wire_format="json", limit=None):
+    """Encode a recorded flight the way the broadcast would send it"""
+    if wire_format == "msgpack" and msgpack is None:
+        raise ValueError("msgpack is not installed")
+    messages = []
+    previous = None
+    for frame in open_recording(path):
+        if wire_format == "struct":
+            messages.append(pack_frame(frame))
+        elif wire_format == "msgpack":
+            messages.append(msgpack.packb(frame.to_dict()))
+        elif wire_format == "patch":
+            # A keyframe first, then patches as DeltaStream sends them
+            data = frame.to_dict()
+            seq = len(messages) + 1
+            if previous is None:
+                messages.append(json.dumps({"type": "keyframe", "seq": seq, "data": data}))
+            else:
+                messages.append(json.dumps({"type": "patch", "seq": seq, "base": seq - 1, "patch": merge_diff(previous, data)}))
+            previous = data
+        else:
+            messages.append(json.dumps(frame.to_dict()))
+        if limit and len(messages) >= limit:
+            break
+    return messages
+
+
+if __name__ == "__main__":
+    # Benchmark compression settings on real frames, e.g.
+    #   python ws_compression.py flight.bin --format patch --min-size 0 128 512
+    parser = argparse.ArgumentParser(description="Compare permessage-deflate settings on recorded telemetry")
+    parser.add_argument("recording", help="FlightRecorder log or MAVLink .tlog")
+    parser.add_argument("--format", default="json", choices=("json", "struct", "msgpack", "patch"))
+    parser.add_argument("--limit", type=int, default=None, help="only the first N frames")
+    parser.add_argument("--window-bits", type=int, nargs="+", default=[9, 12, 15])
+    parser.add_argument("--mem-level", type=int, nargs="+", default=[1, 5, 9])
+    parser.add_argument("--min-size", type=int, nargs="+", default=[0])
+    args = parser.parse_args()
+
+    frames = recording_messages(args.recording, args.format, args.limit)
+    if not frames:
+        sys.exit("No frames in recording")
+    print(f"{len(frames)} {args.format} messages, {sum(len(m) for m in frames)} bytes")
+    print(f"{'bits':>4} {'mem':>3} {'min':>5} {'ctx':>3} {'bytes out':>10} {'ratio':>6} {'us/msg':>7} {'us/KB saved':>11}")
+    for r in benchmark(frames, args.window_bits, args.mem_level, args.min_size):
+        per_kb = f"{r['cpu_us_per_kb_saved']:.1f}" if r["cpu_us_per_kb_saved"] is not None else "-"
+        print(
+            f"{r['window_bits']:>4} {r['mem_level']:>3} {r['min_size']:>5} {'yes' if r['context_takeover'] else 'no':>3} "
+            f"{r['bytes_out']:>10} {r['ratio']:>6.2f} {r['us_per_message']:>7.1f} {per_kb:>11}"
+        )
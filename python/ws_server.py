@@ -2,18 +2,43 @@ import asyncio
 import websockets
 import json
 import logging
+import math
 import time
 import signal
 from drone_connection import DroneConnection
+from worker_pool import vehicle_access_pool
+from client_channel import ClientChannel, ClientQueueOverflow
+from telemetry_frame import GROUP_NAMES
+from telemetry_history import MAX_QUERY_POINTS
+from telemetry_delta import DeltaStream
+from wire_format import SUBPROTOCOLS, WireEncoder, available_formats, schema_descriptor
+from ws_compression import CompressionStats, deflate_extensions
 
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
 
 class WebSocketServer:
-    def __init__(self, host='0.0.0.0', port=8765, drone_connection=None):
+    def __init__(self, host='0.0.0.0', port=8765, drone_connection=None, broadcast_interval=1.0,
+                 keyframe_interval=10.0, compression=True, compression_window_bits=12,
+                 compression_mem_level=5, compression_min_size=0):
         self.host = host
         self.port = port
+        # Anything with DroneConnection's interface works here, e.g. a ReplayConnection
         self.drone_connection = drone_connection or DroneConnection()
+        self.broadcast_interval = broadcast_interval
+        # Keyframes and merge-patches for clients in "patch" stream mode
+        self.delta_stream = DeltaStream(keyframe_interval)
+        # Per-tick encodings of the full snapshot, one per wire format in use
+        self.encoder = WireEncoder()
+        # permessage-deflate: window bits 9-15, zlib memLevel 1-9, and messages
+        # shorter than min_size bytes are sent uncompressed
+        self.compression = compression
+        self.compression_window_bits = compression_window_bits
+        self.compression_mem_level = compression_mem_level
+        self.compression_min_size = compression_min_size
+        self.compression_stats = CompressionStats()
         self.clients = set()
+        # Per-client outbound queue and writer task, keyed by websocket
+        self.channels = {}
         self.lock = asyncio.Lock()
         
         # Health monitoring
@@ -22,17 +47,28 @@ class WebSocketServer:
         self.error_count = 0
         self.last_telemetry_update = None
         self.health_status = "starting"
+        self.broadcast_count = 0
+        self.last_broadcast_duration = None
+        self.subscription_messages = 0
         
         # Graceful shutdown
         self.server = None
         self.broadcast_task = None
+        self.subscription_task = None
         self.shutdown_event = asyncio.Event()
         self.is_shutting_down = False
 
     async def handler(self, websocket):
         # Add client safely
+        channel = ClientChannel(websocket)
         async with self.lock:
             self.clients.add(websocket)
+            self.channels[websocket] = channel
+        channel.start()
+        fmt = SUBPROTOCOLS.get(websocket.subprotocol)
+        if fmt and fmt != "json":
+            channel.set_wire_format(fmt)
+            channel.put_control(json.dumps(schema_descriptor(fmt)))
         logging.info(f"🔌 Client connected: {websocket.remote_address} (Total clients: {len(self.clients)})")
 
         try:
@@ -45,6 +81,8 @@ class WebSocketServer:
         finally:
             async with self.lock:
                 self.clients.discard(websocket)
+                self.channels.pop(websocket, None)
+            await channel.stop()
             logging.info(f"Client removed: {websocket.remote_address} (Total clients: {len(self.clients)})")
 
     def get_health_status(self):
@@ -81,6 +119,12 @@ class WebSocketServer:
                 is_healthy = False
                 issues.append(f"circuit_breaker_{breaker_name}_open")
         
+        # Check vehicle access pool (every worker hung on the link is unhealthy)
+        pool_stats = vehicle_access_pool.get_stats()
+        if pool_stats["stuck_workers"] >= pool_stats["max_workers"]:
+            is_healthy = False
+            issues.append("vehicle_access_pool_stuck")
+        
         status = "healthy" if is_healthy else "unhealthy"
         
         # Debug logging for connection status
@@ -99,6 +143,29 @@ class WebSocketServer:
             "error_rate_percent": error_rate,
             "last_telemetry_update": self.last_telemetry_update,
             "circuit_breakers": circuit_breaker_status,
+            "vehicle_access_pool": pool_stats,
+            "telemetry_source": self.drone_connection.telemetry_source.get_stats() if self.drone_connection.telemetry_source else None,
+            "publication": self.drone_connection.get_publication_stats(),
+            "broadcast": {
+                "count": self.broadcast_count,
+                "last_duration": self.last_broadcast_duration,
+                "subscription_messages": self.subscription_messages,
+                "delta_stream": self.delta_stream.get_stats(),
+                "encoding": self.encoder.get_stats()
+            },
+            "compression": {
+                "enabled": self.compression,
+                "window_bits": self.compression_window_bits,
+                "mem_level": self.compression_mem_level,
+                "min_size": self.compression_min_size,
+                **self.compression_stats.get_stats()
+            },
+            "client_queues": [channel.get_stats() for channel in self.channels.values()],
+            "cache": self.drone_connection.get_cache_stats(),
+            "rolling": self.drone_connection.rolling.get_stats(),
+            "history": self.drone_connection.history.get_stats(),
+            "history_segments": self.drone_connection.segments.get_stats() if self.drone_connection.segments else None,
+            "flight_recorder": self.drone_connection.recorder.get_stats() if self.drone_connection.recorder else None,
             "issues": issues,
             "timestamp": current_time
         }
@@ -109,8 +176,11 @@ class WebSocketServer:
             logging.warning("❌ Telemetry is None or empty")
             return False
         
-        # Check required fields
-        required_fields = ["timestamp", "position", "state", "heartbeat"]
+        # Check required fields (delta snapshots only carry the groups that changed)
+        if "since" in telemetry:
+            required_fields = ["timestamp"]
+        else:
+            required_fields = ["timestamp", "position", "state", "heartbeat"]
         missing_fields = []
         for field in required_fields:
             if field not in telemetry:
@@ -139,7 +209,7 @@ class WebSocketServer:
         
         # Check if critical values are not None/null
         heartbeat = telemetry.get("heartbeat", {})
-        if heartbeat.get("last_heartbeat") is None:
+        if ("heartbeat" in telemetry or "since" not in telemetry) and heartbeat.get("last_heartbeat") is None:
             logging.warning("❌ Heartbeat is None")
             return False
         
@@ -160,36 +230,262 @@ class WebSocketServer:
                 # Run blocking connect in a thread
                 success = await asyncio.to_thread(self.drone_connection.connect_with_retry, conn_str, baud)
                 response = {"status": "connected" if success else "failed"}
-                await websocket.send(json.dumps(response))
+                await self.send_response(websocket, json.dumps(response))
 
             elif action == "disconnect":
                 await asyncio.to_thread(self.drone_connection.disconnect)
                 response = {"status": "disconnected"}
-                await websocket.send(json.dumps(response))
+                await self.send_response(websocket, json.dumps(response))
 
             elif action == "get_telemetry":
-                telemetry = await asyncio.to_thread(self.drone_connection.get_snapshot)
-                if self.is_telemetry_valid(telemetry):
-                    self.last_telemetry_update = time.time()
-                await websocket.send(json.dumps(telemetry))
+                # Optional "since" returns only groups changed after that sequence
+                since = data.get("since")
+                if since is not None and (isinstance(since, bool) or not isinstance(since, int) or since < 0):
+                    await self.send_response(websocket, json.dumps({"error": "invalid since: must be a sequence number"}))
+                else:
+                    telemetry = self.drone_connection.get_snapshot(since)
+                    if self.is_telemetry_valid(telemetry):
+                        self.last_telemetry_update = time.time()
+                    await self.send_response(websocket, json.dumps(telemetry))
                 
+            elif action == "get_history":
+                # Columnar samples between "start" and "end" (epoch seconds), optionally
+                # limited to "fields", resampled every "interval" seconds and reduced
+                # to "max_points" by "decimation" ("douglas_peucker" or "lttb"; default
+                # "douglas_peucker" when latitude and longitude are requested).
+                # "bbox": [min_lat, min_lon, max_lat, max_lon] and
+                # "near": {"lat", "lon", "radius" (meters)} restrict it to an area.
+                # "archive": true reads the compressed on-disk segments instead.
+                # An "id" in the request is echoed in the reply so callers can match them
+                request_id = data.get("id")
+                try:
+                    bbox = data.get("bbox")
+                    if bbox is not None:
+                        bbox = tuple(float(v) for v in bbox)
+                        if len(bbox) != 4:
+                            raise ValueError("bbox must be [min_lat, min_lon, max_lat, max_lon]")
+                    near = data.get("near")
+                    if near is not None:
+                        near = (float(near["lat"]), float(near["lon"]), float(near.get("radius", 50)))
+                    interval = data.get("interval")
+                    if interval is not None and (isinstance(interval, bool) or not isinstance(interval, (int, float))
+                                                 or not math.isfinite(interval) or interval <= 0):
+                        raise ValueError("interval must be a positive number of seconds")
+                    max_points = data.get("max_points")
+                    if max_points is not None and (isinstance(max_points, bool) or not isinstance(max_points, int)
+                                                   or not 1 <= max_points <= MAX_QUERY_POINTS):
+                        raise ValueError(f"max_points must be an integer from 1 to {MAX_QUERY_POINTS}")
+                    history = await asyncio.to_thread(
+                        self.drone_connection.get_history,
+                        data.get("start"),
+                        data.get("end"),
+                        data.get("fields"),
+                        interval,
+                        max_points,
+                        data.get("decimation"),
+                        bbox,
+                        near,
+                        bool(data.get("archive", False))
+                    )
+                except (ValueError, TypeError, KeyError) as e:
+                    await self.send_response(websocket, json.dumps({"error": str(e), "id": request_id}))
+                else:
+                    await self.send_response(websocket, json.dumps({"type": "history", "id": request_id, "data": history}))
+
+            elif action == "get_telemetry_at":
+                # Interpolated state at "timestamp" (epoch seconds); null outside the history
+                try:
+                    state = self.drone_connection.telemetry_at(float(data["timestamp"]))
+                except (KeyError, TypeError, ValueError):
+                    await self.send_response(websocket, json.dumps({"error": "timestamp is required"}))
+                else:
+                    await self.send_response(websocket, json.dumps({"type": "telemetry_at", "data": state}))
+
+            elif action == "subscribe":
+                # {"groups": {"attitude": 30, "battery": 1}} - only these groups,
+                # each at most at its rate (Hz), instead of the full snapshot
+                groups = data.get("groups")
+                error = None
+                if not isinstance(groups, dict) or not groups:
+                    error = "groups must be an object of {group: rate}"
+                else:
+                    for group, rate in groups.items():
+                        if group not in GROUP_NAMES:
+                            error = f"Unknown group: {group}"
+                        elif (isinstance(rate, bool) or not isinstance(rate, (int, float))
+                              or (isinstance(rate, float) and not math.isfinite(rate)) or rate <= 0):
+                            error = f"Rate for {group} must be a positive number"
+                channel = self.channels.get(websocket)
+                if error or channel is None:
+                    await self.send_response(websocket, json.dumps({"error": error or "Not subscribable"}))
+                else:
+                    channel.subscribe(groups)
+                    await self.send_response(websocket, json.dumps({"type": "subscribed", "groups": channel.subscriptions}))
+
+            elif action == "unsubscribe":
+                # Back to the full snapshot broadcast
+                channel = self.channels.get(websocket)
+                if channel is not None:
+                    channel.subscribe(None)
+                await self.send_response(websocket, json.dumps({"type": "unsubscribed"}))
+
+            elif action == "stream":
+                # {"mode": "patch"} - a keyframe now and every keyframe_interval seconds,
+                # merge-patches of the changed leaves in between; "full" restores
+                # whole snapshots. Sending it again requests a fresh keyframe
+                mode = data.get("mode", "patch")
+                channel = self.channels.get(websocket)
+                if mode not in ("full", "patch"):
+                    await self.send_response(websocket, json.dumps({"error": f"Unknown stream mode: {mode}"}))
+                elif channel is None:
+                    await self.send_response(websocket, json.dumps({"error": "Not streamable"}))
+                else:
+                    channel.set_stream_mode(mode)
+                    await self.send_response(websocket, json.dumps({
+                        "type": "stream",
+                        "mode": mode,
+                        "keyframe_interval": self.delta_stream.keyframe_interval
+                    }))
+
+            elif action == "set_format":
+                # {"format": "struct" | "msgpack" | "json"} for the full-snapshot broadcast.
+                # Replies with the schema descriptor; binary telemetry arrives as binary
+                # frames while replies stay JSON text
+                fmt = data.get("format")
+                channel = self.channels.get(websocket)
+                if fmt not in available_formats():
+                    await self.send_response(websocket, json.dumps({"error": f"Unsupported format: {fmt}"}))
+                elif channel is None:
+                    await self.send_response(websocket, json.dumps({"error": "Not streamable"}))
+                else:
+                    channel.set_wire_format(fmt)
+                    await self.send_response(websocket, json.dumps(schema_descriptor(fmt)))
+
             elif action == "health_check":
                 health = self.get_health_status()
-                await websocket.send(json.dumps(health))
+                await self.send_response(websocket, json.dumps(health))
+
+            elif action == "get_stats":
+                # Rolling min/max/mean/stddev of key fields over 10 s, 1 min and 10 min
+                stats = self.drone_connection.rolling.get_stats()
+                await self.send_response(websocket, json.dumps({"type": "stats", "data": stats}))
 
             else:
-                await websocket.send(json.dumps({"error": "Unknown action"}))
+                await self.send_response(websocket, json.dumps({"error": "Unknown action"}))
 
         except json.JSONDecodeError:
             self.error_count += 1
-            await websocket.send(json.dumps({"error": "Invalid JSON"}))
+            await self.send_response(websocket, json.dumps({"error": "Invalid JSON"}))
         except Exception as e:
             self.error_count += 1
             logging.error(f"Message processing error: {e}")
-            await websocket.send(json.dumps({"error": "Internal server error"}))
+            await self.send_response(websocket, json.dumps({"error": "Internal server error"}))
         except Exception as e:
             logging.error(f"Error processing message: {e}")
-            await websocket.send(json.dumps({"error": "Server error"}))
+            await self.send_response(websocket, json.dumps({"error": "Server error"}))
+
+    async def send_response(self, websocket, message):
+        """Queue a reply or other must-deliver message for one client"""
+        channel = self.channels.get(websocket)
+        if channel is None:
+            await websocket.send(message)
+            return
+        try:
+            channel.put_control(message)
+        except ClientQueueOverflow as e:
+            logging.warning(f"⚠️ Disconnecting slow client {websocket.remote_address}: {e}")
+            await websocket.close(code=1013, reason="Client too slow")
+
+    def fan_out(self, telemetry, frame):
+        """Hand one telemetry snapshot to every client's queue.
+
+        The snapshot is encoded once per format actually in use: in the
+        client's wire format for "full" clients, as this tick's patch or
+        keyframe for "patch" clients.
+        Each client's writer task delivers it; a client that has not sent the
+        previous frame yet just gets this one instead.
+        """
+        started = time.perf_counter()
+        self.delta_stream.advance(telemetry)
+        self.encoder.begin(frame, telemetry)
+        now = time.monotonic()
+        for channel in list(self.channels.values()):
+            if channel.subscriptions is not None:
+                continue
+            if channel.stream_mode == "patch":
+                channel.put_latest(self.delta_stream.message_for(channel, now))
+            else:
+                channel.put_latest(self.encoder.message(channel.wire_format))
+        self.broadcast_count += 1
+        self.last_broadcast_duration = time.perf_counter() - started
+
+    async def dispatch_subscriptions(self):
+        """Send subscribed clients only their groups, each at the client's chosen rate.
+
+        A group is encoded at most once per tick however many clients want it,
+        and is skipped for a client until it changes again. Frames go through
+        the same connection and validity checks as the full broadcast.
+        """
+        checked_frame = None
+        checked_at = 0.0
+        frame_valid = False
+        try:
+            while not self.shutdown_event.is_set():
+                try:
+                    subscribed = [channel for channel in self.channels.values() if channel.subscriptions]
+                    if not subscribed:
+                        await asyncio.sleep(0.1)
+                        continue
+
+                    if not self.drone_connection.is_connected or not self.drone_connection.vehicle:
+                        await asyncio.sleep(1.0)
+                        continue
+
+                    frame = self.drone_connection.get_frame()
+                    now = time.monotonic()
+                    # Validate each new frame once, and a held frame again every second as it ages
+                    if frame is not checked_frame or now - checked_at >= 1.0:
+                        frame_valid = self.is_telemetry_valid({
+                            "timestamp": frame.timestamp,
+                            "connection_status": frame.connection_status,
+                            "position": frame.position,
+                            "state": frame.state,
+                            "heartbeat": frame.heartbeat.to_dict()
+                        })
+                        checked_frame = frame
+                        checked_at = now
+                    if not frame_valid:
+                        await asyncio.sleep(1.0)
+                        continue
+
+                    group_seqs = dict(zip(GROUP_NAMES, frame.group_seqs))
+                    encoded = {}
+                    for channel in subscribed:
+                        for group in channel.due_groups(now, group_seqs):
+                            message = encoded.get(group)
+                            if message is None:
+                                message = encoded[group] = json.dumps({
+                                    "timestamp": frame.timestamp,
+                                    "connection_status": frame.connection_status,
+                                    "seq": frame.seq,
+                                    "group": group,
+                                    group: frame.group(group).to_dict()
+                                })
+                            channel.put_latest(message, topic=group)
+                    self.subscription_messages += len(encoded)
+
+                    fastest = max(rate for channel in subscribed for rate in channel.subscriptions.values())
+                    await asyncio.sleep(1.0 / fastest)
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    if not self.shutdown_event.is_set():
+                        logging.error(f"Subscription dispatch error: {e}")
+                        await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            logging.info("Subscription dispatch cancelled")
+            raise
 
     async def broadcast_telemetry(self):
         last_health_log = 0
@@ -224,37 +520,10 @@ class WebSocketServer:
                             if not self.drone_connection.vehicle:
                                 continue
                                 
+                            # Lock-free read of the frame published by the acquisition thread
                             try:
-                                # Force fresh telemetry collection by calling telemetry directly
-                                logging.debug("🔄 Forcing fresh telemetry collection...")
-                                
-                                # Try to get fresh telemetry directly from the telemetry object
-                                if self.drone_connection.telemetry:
-                                    fresh_telemetry = await asyncio.to_thread(
-                                        self.drone_connection.telemetry.full_snapshot
-                                    )
-                                    if fresh_telemetry:
-                                        # Add fresh timestamp and connection status
-                                        fresh_telemetry["timestamp"] = time.time()
-                                        fresh_telemetry["connection_status"] = "CONNECTED"
-                                        telemetry = fresh_telemetry
-                                        logging.debug("✅ Got fresh telemetry directly from telemetry object")
-                                    else:
-                                        # Fallback to get_snapshot with timeout
-                                        telemetry = await asyncio.wait_for(
-                                            asyncio.to_thread(self.drone_connection.get_snapshot),
-                                            timeout=3.0
-                                        )
-                                else:
-                                    # Fallback to get_snapshot with timeout
-                                    telemetry = await asyncio.wait_for(
-                                        asyncio.to_thread(self.drone_connection.get_snapshot),
-                                        timeout=3.0
-                                    )
-                                
-                            except asyncio.TimeoutError:
-                                logging.warning("⏰ Telemetry collection timeout - using fallback")
-                                telemetry = None
+                                frame = self.drone_connection.get_frame()
+                                telemetry = frame.to_dict()
                             except Exception as e:
                                 logging.error(f"❌ Error getting telemetry: {e}")
                                 telemetry = None
@@ -292,23 +561,8 @@ class WebSocketServer:
                         
                         if self.is_telemetry_valid(telemetry):
                             self.last_telemetry_update = current_time
-                            message = json.dumps(telemetry)
-                            
-                 
-                            
-                            async with self.lock:
-                                clients_to_remove = set()
-                                
-                                for client in self.clients:
-                                    try:
-                                        await client.send(message)
-                                    except websockets.exceptions.ConnectionClosed:
-                                        clients_to_remove.add(client)
-                                    except Exception as e:
-                                        clients_to_remove.add(client)
-                                
-                                # Remove disconnected clients
-                                self.clients -= clients_to_remove
+                            # Encoded once per wire format, delivered by each client's writer task
+                            self.fan_out(telemetry, frame)
 
                         else:
                             logging.warning("Telemetry validation failed - investigating...")
@@ -330,7 +584,7 @@ class WebSocketServer:
                         await asyncio.sleep(5)  
                         continue
                     
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(self.broadcast_interval)
                     
                 except Exception as e:
                     if not self.shutdown_event.is_set():
@@ -363,6 +617,17 @@ class WebSocketServer:
                 except (asyncio.TimeoutError, asyncio.CancelledError):
                     logging.warning("Broadcast task didn't stop gracefully")
             
+            if self.subscription_task and not self.subscription_task.done():
+                self.subscription_task.cancel()
+                try:
+                    await asyncio.wait_for(self.subscription_task, timeout=5)
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    pass
+
+            # Stop the writer tasks so the shutdown notice is sent directly
+            for channel in list(self.channels.values()):
+                await channel.stop()
+
             # Notify all clients about shutdown
             if self.clients:
                 shutdown_message = json.dumps({
@@ -393,7 +658,7 @@ class WebSocketServer:
             
             # Close WebSocket server
             if self.server:
-                await self.server.close()
+                self.server.close()
                 try:
                     await asyncio.wait_for(self.server.wait_closed(), timeout=5)
                 except asyncio.TimeoutError:
@@ -424,6 +689,15 @@ class WebSocketServer:
         if hasattr(signal, 'SIGQUIT'):
             signal.signal(signal.SIGQUIT, signal_handler)
 
+    @staticmethod
+    def select_subprotocol(connection, subprotocols):
+        """Accept the first telemetry subprotocol offered, or none (plain JSON)"""
+        formats = available_formats()
+        for subprotocol in subprotocols:
+            if SUBPROTOCOLS.get(subprotocol) in formats:
+                return subprotocol
+        return None
+
     async def start_server(self):
         """Enhanced server start with graceful shutdown support"""
         try:
@@ -436,16 +710,30 @@ class WebSocketServer:
                 self.handler, 
                 self.host, 
                 self.port,
+                select_subprotocol=self.select_subprotocol,
+                compression=None,
+                extensions=deflate_extensions(
+                    self.compression_window_bits,
+                    self.compression_mem_level,
+                    self.compression_min_size,
+                    self.compression_stats
+                ) if self.compression else None,
                 ping_interval=20,  # Send ping every 20 seconds
                 ping_timeout=10,   # Wait 10 seconds for pong response
                 close_timeout=10   # Wait 10 seconds for close handshake
             )
             logging.info(f"WebSocket server started at ws://{self.host}:{self.port}")
             logging.info(f"WebSocket config: ping_interval=20s, ping_timeout=10s, close_timeout=10s")
+            if self.compression:
+                logging.info(f"🗜️ permessage-deflate: window_bits={self.compression_window_bits}, "
+                             f"mem_level={self.compression_mem_level}, min_size={self.compression_min_size}")
+            else:
+                logging.info("🗜️ permessage-deflate disabled")
             self.health_status = "healthy"
 
             # Start background telemetry broadcast
             self.broadcast_task = asyncio.create_task(self.broadcast_telemetry())
+            self.subscription_task = asyncio.create_task(self.dispatch_subscriptions())
 
             # Wait for shutdown signal with timeout to make it more responsive
             try:
@@ -5,6 +5,7 @@ import { Icon, LatLng } from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 import type { TelemetryData, Waypoint } from '../../types';
 import { DroneCompass } from './DroneCompass';
+import { useFlightTrack } from '../../hooks/useFlightTrack';
 // import GoogleMapTracker from './GoogleMapTracker'; // Available for future use
 
 // Fix for default markers in React Leaflet
@@ -28,6 +29,9 @@ interface DroneMapProps {
   waypoints?: Waypoint[];
   flightPath?: LatLng[];
   onMapClick?: (lat: number, lon: number) => void;
+  // Without a flightPath, the recent track is fetched from the backend,
+  // decimated server-side to at most maxTrackPoints points
+  maxTrackPoints?: number;
 }
 
 // Component to update map view when drone moves
@@ -47,11 +51,17 @@ export const DroneMap: React.FC<DroneMapProps> = ({
   telemetry, 
   waypoints = [], 
   flightPath = [],
-  onMapClick 
+  onMapClick,
+  maxTrackPoints = 500
 }) => {
   const [followDrone, setFollowDrone] = React.useState(true);
   const [mapType, setMapType] = React.useState<'satellite' | 'street' | 'dark' | 'terrain'>('satellite');
   const mapRef = useRef<any>(null);
+  const serverTrack = useFlightTrack({
+    maxPoints: maxTrackPoints,
+    enabled: flightPath.length === 0
+  });
+  const trackPositions = flightPath.length > 0 ? flightPath : serverTrack;
   
   // Default center coordinates (you can change this to your preferred location)
   const defaultCenter: LatLng = new LatLng(37.7749, -122.4194); // San Francisco
@@ -197,9 +207,9 @@ export const DroneMap: React.FC<DroneMapProps> = ({
         ))}
 
         {/* Flight Path */}
-        {flightPath.length > 1 && (
+        {trackPositions.length > 1 && (
           <Polyline 
-            positions={flightPath} 
+            positions={trackPositions} 
             color="blue" 
             weight={3}
             opacity={0.7}
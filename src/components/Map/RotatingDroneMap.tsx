@@ -1,9 +1,10 @@
 // src/components/Map/RotatingDroneMap.tsx
 import React, { useState, useEffect, useRef } from 'react';
-import { MapContainer, TileLayer, Marker, useMap } from 'react-leaflet';
+import { MapContainer, TileLayer, Marker, Polyline, useMap } from 'react-leaflet';
 import L from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 import droneIcon from '../../assets/drone.png';
+import { useFlightTrack } from '../../hooks/useFlightTrack';
 
 // WebSocket telemetry interface
 interface TelemetryData {
@@ -39,6 +40,8 @@ const RotatingDroneMap: React.FC<RotatingDroneMapProps> = ({ className = "" }) =
   const [telemetryData, setTelemetryData] = useState<TelemetryData | null>(null);
   const [connectionStatus, setConnectionStatus] = useState<'connecting' | 'connected' | 'disconnected'>('disconnected');
   const wsRef = useRef<WebSocket | null>(null);
+  // Recent flight track, decimated server-side to at most 500 points
+  const track = useFlightTrack({ maxPoints: 500 });
 
   // Get current position and yaw from telemetry
   const currentPosition: [number, number] = telemetryData?.position 
@@ -133,6 +136,11 @@ const RotatingDroneMap: React.FC<RotatingDroneMapProps> = ({ className = "" }) =
           attribution='&copy; <a href="https://www.esri.com/">Esri</a>, DigitalGlobe, GeoEye, Earthstar Geographics, CNES/Airbus DS, USDA, USGS, AeroGRID, IGN, and the GIS User Community'
         />
         
+        {/* Decimated flight track */}
+        {track.length > 1 && (
+          <Polyline positions={track} color="#06b6d4" weight={2} opacity={0.7} />
+        )}
+
         {/* Rotating Drone Marker */}
         <Marker
           position={currentPosition}
@@ -15,6 +15,7 @@ import {
   XCircle
 } from 'lucide-react';
 import type { HealthData } from '../../types';
+import { BACKEND_URL } from '../../config';
 
 interface HealthMonitorProps {
   className?: string;
@@ -27,7 +28,7 @@ export const HealthMonitor: React.FC<HealthMonitorProps> = ({ className = '' })
 
   const fetchHealth = async () => {
     try {
-      const response = await fetch('http://localhost:3000/health');
+      const response = await fetch(`${BACKEND_URL}/health`);
       if (response.ok) {
         const data = await response.json();
         setHealthData(data);
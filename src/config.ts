@@ -0,0 +1,3 @@
+// src/config.ts
+// Node backend the UI talks to; it holds the only connection to the drone server
+export const BACKEND_URL: string = import.meta.env.VITE_BACKEND_URL ?? 'http://localhost:3000';
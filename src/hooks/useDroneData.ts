@@ -1,8 +1,7 @@
 // src/hooks/useDroneData.ts
 import { useState, useEffect, useCallback, useRef } from 'react';
 import type { TelemetryData, DroneStatus, HealthData, TelemetryHistory } from '../types';
-
-const BACKEND_URL = 'http://localhost:3000';
+import { BACKEND_URL } from '../config';
 
 export const useDroneData = () => {
   const [telemetry, setTelemetry] = useState<TelemetryData>({});
@@ -0,0 +1,81 @@
+// src/hooks/useFlightTrack.ts
+import { useState, useEffect } from 'react';
+import { BACKEND_URL } from '../config';
+
+export type TrackPoint = [number, number];
+
+// History query for a decimated lat/lon track of the last windowSeconds;
+// the server keeps at most maxPoints samples using Douglas-Peucker on the polyline
+export const buildTrackQuery = (maxPoints: number, windowSeconds: number) => new URLSearchParams({
+  start: String(Date.now() / 1000 - windowSeconds),
+  fields: 'timestamp,latitude,longitude',
+  max_points: String(maxPoints),
+  decimation: 'douglas_peucker'
+});
+
+// Track points from the columnar history data
+export const parseTrack = (data: any): TrackPoint[] => {
+  if (!data?.latitude || !data?.longitude) {
+    return [];
+  }
+  const { latitude, longitude } = data;
+  const points: TrackPoint[] = [];
+  for (let i = 0; i < latitude.length; i++) {
+    const lat = latitude[i];
+    const lon = longitude[i];
+    // Samples before the first GPS fix are stored as 0, 0
+    if (lat === null || lon === null || (lat === 0 && lon === 0)) continue;
+    points.push([lat, lon]);
+  }
+  return points;
+};
+
+interface UseFlightTrackOptions {
+  maxPoints?: number;
+  windowSeconds?: number;
+  refreshMs?: number;
+  enabled?: boolean;
+}
+
+// Polls the backend for the recent flight track, already decimated server-side
+export const useFlightTrack = ({
+  maxPoints = 500,
+  windowSeconds = 3600,
+  refreshMs = 5000,
+  enabled = true
+}: UseFlightTrackOptions = {}) => {
+  const [track, setTrack] = useState<TrackPoint[]>([]);
+
+  useEffect(() => {
+    if (!enabled) {
+      return;
+    }
+
+    let cancelled = false;
+
+    const fetchTrack = async () => {
+      try {
+        const response = await fetch(`${BACKEND_URL}/drone/history?${buildTrackQuery(maxPoints, windowSeconds)}`);
+        if (!response.ok) {
+          return;
+        }
+        const result = await response.json();
+        if (!cancelled) {
+          setTrack(parseTrack(result.data));
+        }
+      } catch (error) {
+        console.error('Failed to fetch flight track:', error);
+      }
+    };
+
+    fetchTrack();
+    const interval = setInterval(fetchTrack, refreshMs);
+
+    return () => {
+      cancelled = true;
+      clearInterval(interval);
+    };
+  }, [maxPoints, windowSeconds, refreshMs, enabled]);
+
+  return track;
+};
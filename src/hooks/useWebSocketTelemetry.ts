@@ -1,5 +1,7 @@
 // src/hooks/useWebSocketTelemetry.ts
 import { useState, useEffect, useCallback, useRef } from 'react';
+// Shared with the Node backend, so both rebuild snapshots from the patch stream the same way
+import { TelemetryStreamDecoder } from '../../nodejs-backend/src/telemetryStream';
 
 interface GPSCoordinates {
   latitude: number;
@@ -30,6 +32,8 @@ interface TelemetryData {
 interface UseWebSocketTelemetryOptions {
   url: string;
   reconnectInterval?: number;
+  // Ask the server for keyframes + merge-patches instead of full snapshots
+  streamPatches?: boolean;
   onConnect?: () => void;
   onDisconnect?: () => void;
   onError?: (error: string) => void;
@@ -38,6 +42,7 @@ interface UseWebSocketTelemetryOptions {
 export const useWebSocketTelemetry = ({
   url,
   reconnectInterval = 3000,
+  streamPatches = false,
   onConnect,
   onDisconnect,
   onError
@@ -49,6 +54,13 @@ export const useWebSocketTelemetry = ({
 
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<number | null>(null);
+  // Patch stream state; merge-patches give React new objects for the changed branches only
+  const streamDecoderRef = useRef(new TelemetryStreamDecoder());
+
+  const requestKeyframe = useCallback(() => {
+    streamDecoderRef.current.reset();
+    wsRef.current?.send(JSON.stringify({ action: 'stream', mode: 'patch' }));
+  }, []);
 
   const connectWebSocket = useCallback(() => {
     try {
@@ -59,12 +71,29 @@ export const useWebSocketTelemetry = ({
         console.log('WebSocket connected');
         setIsConnected(true);
         setConnectionError(null);
+        if (streamPatches) {
+          requestKeyframe();
+        }
         onConnect?.();
       };
 
       wsRef.current.onmessage = (event) => {
         try {
-          const data: TelemetryData = JSON.parse(event.data);
+          let data: TelemetryData = JSON.parse(event.data);
+          const message: any = data;
+          if (message.type === 'stream') {
+            return;
+          }
+          const result = streamDecoderRef.current.handle(message);
+          if (result.kind === 'snapshot') {
+            data = result.data;
+          } else if (result.kind === 'resync') {
+            console.warn('Telemetry stream gap, requesting keyframe');
+            requestKeyframe();
+            return;
+          } else if (message.type === 'patch') {
+            return; // keyframe already requested
+          }
           setTelemetryData(data);
           
           // Update position if GPS data is available
@@ -106,7 +135,7 @@ export const useWebSocketTelemetry = ({
       setConnectionError(errorMessage);
       onError?.(errorMessage);
     }
-  }, [url, reconnectInterval, onConnect, onDisconnect, onError]);
+  }, [url, reconnectInterval, streamPatches, requestKeyframe, onConnect, onDisconnect, onError]);
 
   const disconnect = useCallback(() => {
     if (reconnectTimeoutRef.current) {